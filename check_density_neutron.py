@@ -4,15 +4,18 @@ Quick check of density-neutron crossover display
 import pandas as pd
 import matplotlib.pyplot as plt
 
-df = pd.read_csv("Anya_105_Upper_Juandah_to_Eurombah_Analysis.csv")
+cols = ['DEPTH', 'RHOB', 'NPHI', 'GR', 'PE', 'COAL_FLAG']
+df = pd.read_csv("Anya_105_Upper_Juandah_to_Eurombah_Analysis.csv", usecols=cols,
+                 dtype={'RHOB': 'float32', 'NPHI': 'float32', 'GR': 'float32',
+                        'PE': 'float32', 'COAL_FLAG': 'bool'})
 
-# Sample a portion to check
-sample = df[(df['DEPTH'] > 470) & (df['DEPTH'] < 485)].copy()
+# Sample a portion to check (read-only view, no copy needed)
+sample = df.loc[df['DEPTH'].between(470, 485, inclusive='neither'), cols]
 
 print("DENSITY-NEUTRON CHECK")
 print("="*60)
 print("\nSample data around coal zone (478-479m):")
-print(sample[['DEPTH', 'RHOB', 'NPHI', 'GR', 'PE', 'COAL_FLAG']].to_string(index=False))
+print(sample.to_string(index=False))
 
 print("\n" + "="*60)
 print("SCALE CHECK:")
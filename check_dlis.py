@@ -42,13 +42,12 @@ try:
                     except:
                         print(f"  {j+1:2d}. {channel.name}")
                     
-                # Show depth range
+                # Show depth range (decode the index channel only, not the whole frame)
                 try:
-                    curves = frame.curves()
-                    print(f"\nData Points: {len(curves)} samples")
-                    if len(curves) > 0:
-                        depth_col = curves.columns[0]
-                        print(f"Depth Range: {curves[depth_col].min():.2f} to {curves[depth_col].max():.2f}")
+                    index = frame.channels[0].curves()
+                    print(f"\nData Points: {len(index)} samples")
+                    if len(index) > 0:
+                        print(f"Depth Range: {index.min():.2f} to {index.max():.2f}")
                 except Exception as e:
                     print(f"Could not load curve data: {e}")
             
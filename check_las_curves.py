@@ -5,7 +5,7 @@ Check available curves in LAS file and map them properly
 import lasio
 import pandas as pd
 
-las = lasio.read("Raw dataset/qgc_anya_105_mai_mfe_mss_mpd_mdn_hires.las")
+las = lasio.read("Raw dataset/qgc_anya_105_mai_mfe_mss_mpd_mdn_hires.las", engine="numpy")
 
 print("="*80)
 print("AVAILABLE CURVES IN LAS FILE")
@@ -21,8 +21,9 @@ print("\n" + "="*80)
 print("LIKELY CURVE MAPPINGS FOR CSG ANALYSIS")
 print("="*80)
 
-# Analyze curve names
-df = las.df().reset_index()
+# Analyze curve names - build the frame straight from the data block
+# rather than round-tripping through las.df().reset_index()
+df = pd.DataFrame(las.data, columns=[c.mnemonic for c in las.curves])
 
 mappings = {
     'DEPT': 'Depth',
@@ -40,11 +41,15 @@ mappings = {
     'RTAO': 'Resistivity (another)',
 }
 
+# Look curves and columns up by name once instead of scanning per mapping
+curves_by_name = {c.mnemonic: c for c in las.curves}
+columns = set(df.columns)
+
 for curve, description in mappings.items():
-    if curve in df.columns:
+    if curve in columns:
         data = df[curve].dropna()
         if len(data) > 0:
             print(f"\n{curve:8s} ({description})")
             print(f"  Range: {data.min():.4f} to {data.max():.4f}")
             print(f"  Mean:  {data.mean():.4f}")
-            print(f"  Unit:  {las.curves[curve].unit if curve in las.curves else 'unknown'}")
+            print(f"  Unit:  {curves_by_name[curve].unit if curve in curves_by_name else 'unknown'}")
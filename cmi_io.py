@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+CMI Channel Cache
+Decode DLIS channels and LAS curves once and keep them as .npy files for
+memory-mapped reuse, and keep exported CMI images as .npy sidecars next to their CSV.
+Also holds the image helpers shared by the processing and plotting scripts
+"""
+
+import os
+import warnings
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+DLIS_FILE = 'Raw dataset/qgc_anya-105_mcg-cmi.dlis'
+CACHE_DIR = 'cache'
+
+# Button pad names (8 pads × 2 rows = 16 channels)
+BUTTON_CHANNELS = [
+    'BT1L', 'BT1U', 'BT2L', 'BT2U', 'BT3L', 'BT3U', 'BT4L', 'BT4U',
+    'BT5L', 'BT5U', 'BT6L', 'BT6U', 'BT7L', 'BT7U', 'BT8L', 'BT8U'
+]
+
+CMI_CHANNELS = ['DEPTH', 'AZIM', 'P1AZ', 'MSPD', 'CMI_DYN'] + BUTTON_CHANNELS
+
+# High-resolution open-hole log with the density (HDEN) used to screen out siderite
+LAS_FILE = 'Raw dataset/qgc_anya_105_mai_mfe_mss_mpd_mdn_hires.las'
+LAS_CURVES = ['DEPT', 'HDEN']
+
+# Unwrapped image written by cmi_no_interpolation.py (DEPTH + one column per azimuth bin)
+CMI_IMAGE_CSV = 'CMI_NoInterpolation_Image.csv'
+
+# Exported image plus its per-depth azimuthal mean and count of non-NaN bins
+CMIImage = namedtuple('CMIImage', ['depth', 'image', 'avg_conductivity', 'valid_samples'])
+
+# Zone rows of the orientation channels plus all button channels side by side
+CMIZone = namedtuple('CMIZone', ['depth', 'azimuth', 'p1az', 'buttons', 'widths'])
+
+
+def cache_dir_for(dlis_file, cache_dir=CACHE_DIR):
+    """Cache directory holding one .npy file per channel of a DLIS file"""
+    stem = os.path.splitext(os.path.basename(dlis_file))[0]
+    return os.path.join(cache_dir, stem)
+
+
+def build_cache(dlis_file=DLIS_FILE, channels=CMI_CHANNELS, cache_dir=CACHE_DIR):
+    """Decode channels from the first frame and save each as <name>.npy"""
+    from dlisio import dlis  # only needed when the cache is (re)built
+    
+    out_dir = cache_dir_for(dlis_file, cache_dir)
+    os.makedirs(out_dir, exist_ok=True)
+
+    with dlis.load(dlis_file) as files:
+        frame = files[0].frames[0]
+        frame_channels = {channel.name: channel for channel in frame.channels}
+        for name in channels:
+            np.save(os.path.join(out_dir, f'{name}.npy'), frame_channels[name].curves())
+
+    return out_dir
+
+
+def load_channels(dlis_file=DLIS_FILE, channels=CMI_CHANNELS, cache_dir=CACHE_DIR):
+    """Memory-map cached channels, decoding the DLIS only for missing or stale ones"""
+    out_dir = cache_dir_for(dlis_file, cache_dir)
+    paths = {name: os.path.join(out_dir, f'{name}.npy') for name in channels}
+
+    dlis_mtime = os.path.getmtime(dlis_file) if os.path.exists(dlis_file) else 0
+    stale = [name for name, path in paths.items()
+             if not os.path.exists(path) or os.path.getmtime(path) < dlis_mtime]
+    if stale:
+        print(f"Caching {len(stale)} DLIS channels to {out_dir}/ ...")
+        build_cache(dlis_file, stale, cache_dir)
+
+    return {name: np.load(path, mmap_mode='r') for name, path in paths.items()}
+
+
+def build_las_cache(las_file=LAS_FILE, curves=LAS_CURVES, cache_dir=CACHE_DIR):
+    """Parse the LAS file and save each curve as <name>.npy"""
+    import lasio  # only needed when the cache is (re)built
+    
+    out_dir = cache_dir_for(las_file, cache_dir)
+    os.makedirs(out_dir, exist_ok=True)
+
+    las = lasio.read(las_file, engine='numpy')
+    for name in curves:
+        np.save(os.path.join(out_dir, f'{name}.npy'), las[name])
+
+    return out_dir
+
+
+def load_las_curves(las_file=LAS_FILE, curves=LAS_CURVES, cache_dir=CACHE_DIR):
+    """Memory-map cached LAS curves, parsing the LAS text only for missing or stale ones"""
+    out_dir = cache_dir_for(las_file, cache_dir)
+    paths = {name: os.path.join(out_dir, f'{name}.npy') for name in curves}
+
+    las_mtime = os.path.getmtime(las_file) if os.path.exists(las_file) else 0
+    stale = [name for name, path in paths.items()
+             if not os.path.exists(path) or os.path.getmtime(path) < las_mtime]
+    if stale:
+        print(f"Caching {len(stale)} LAS curves to {out_dir}/ ...")
+        build_las_cache(las_file, stale, cache_dir)
+
+    return {name: np.load(path, mmap_mode='r') for name, path in paths.items()}
+
+
+def zone_rows(depth, top, base):
+    """Row slice covering top <= depth <= base (depth is monotonic, so the zone is contiguous)"""
+    rows = np.nonzero((depth >= top) & (depth <= base))[0]
+    if rows.size == 0:
+        raise ValueError(f"No samples in zone {top}-{base} m; "
+                         f"file depths span {np.nanmin(depth):.2f}-{np.nanmax(depth):.2f} m")
+    return slice(rows[0], rows[-1] + 1)
+
+
+def load_cmi_zone(top, base, dlis_file=DLIS_FILE, channels=BUTTON_CHANNELS, cache_dir=CACHE_DIR):
+    """Zone depth/azimuths and button channels as one float32 (depth, button) array, nulls as NaN"""
+    data = load_channels(dlis_file, channels=['DEPTH', 'AZIM', 'P1AZ'] + list(channels), cache_dir=cache_dir)
+    rows = zone_rows(data['DEPTH'], top, base)
+    depth = np.array(data['DEPTH'][rows])
+
+    # Copy each channel's zone rows straight into its columns, (N, 1, X) -> (N, X).
+    # Channels fill disjoint columns, so the page-ins and copies run in parallel
+    widths = [data[name].shape[-1] for name in channels]
+    starts = np.concatenate([[0], np.cumsum(widths)[:-1]])
+    buttons = np.empty((len(depth), sum(widths)), dtype=np.float32)
+
+    def copy_channel(i):
+        name, col, width = channels[i], starts[i], widths[i]
+        buttons[:, col:col + width] = data[name][rows].reshape(len(depth), width)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(copy_channel, range(len(channels))))
+
+    # -9999 and any other negative reading are nulls
+    np.putmask(buttons, buttons < 0, np.nan)
+
+    return CMIZone(depth, np.array(data['AZIM'][rows]), np.array(data['P1AZ'][rows]),
+                   buttons, widths)
+
+
+def image_sidecar(csv_file=CMI_IMAGE_CSV, field='image'):
+    """Binary (.npy) copy of one array of an exported image CSV"""
+    return f'{os.path.splitext(csv_file)[0]}.{field}.npy'
+
+
+def save_cmi_image(depth, image, csv_file=CMI_IMAGE_CSV):
+    """Write the binary sidecars with the per-depth profiles; call after the CSV so the sidecars are newer"""
+    image = np.asarray(image, dtype=np.float32)
+    
+    # One NaN mask gives both the per-depth valid count and the mean over valid bins
+    valid = ~np.isnan(image)
+    valid_samples = np.sum(valid, axis=1)
+    with np.errstate(invalid='ignore'):
+        avg_conductivity = np.sum(image, axis=1, where=valid, dtype=np.float64) / valid_samples
+    
+    arrays = CMIImage(np.asarray(depth, dtype=np.float64), image, avg_conductivity, valid_samples)
+    for field, arr in zip(CMIImage._fields, arrays):
+        np.save(image_sidecar(csv_file, field), arr)
+
+
+def load_cmi_image(csv_file=CMI_IMAGE_CSV):
+    """Exported CMI image (memory-mapped) and its azimuthal profiles, parsing the CSV only if the sidecars are missing or stale"""
+    paths = [image_sidecar(csv_file, field) for field in CMIImage._fields]
+    stale = not all(os.path.exists(path) for path in paths) or (
+        os.path.exists(csv_file) and
+        min(os.path.getmtime(path) for path in paths) < os.path.getmtime(csv_file))
+    if stale:
+        # Azimuth columns parse straight to float32 (one block, no float64 copy); depth stays float64
+        cmi_data = pd.read_csv(csv_file, dtype=defaultdict(lambda: np.float32, DEPTH=np.float64))
+        save_cmi_image(cmi_data['DEPTH'].to_numpy(),
+                       cmi_data.drop(columns='DEPTH').to_numpy(dtype=np.float32), csv_file)
+    
+    # The image is paged in on demand; the 1D profiles are small enough to read outright
+    return CMIImage(*(np.load(path, mmap_mode='r' if field == 'image' else None)
+                      for field, path in zip(CMIImage._fields, paths)))
+
+
+def partition_percentiles(values, percents):
+    """Linear-interpolated percentiles of the non-NaN values (as np.nanpercentile) from one partial sort"""
+    valid = values[~np.isnan(values)]
+    pos = np.asarray(percents, dtype=float) / 100 * (valid.size - 1)
+    lo = np.floor(pos).astype(int)
+    hi = np.minimum(lo + 1, valid.size - 1)
+    part = np.partition(valid, np.unique(np.concatenate([lo, hi])))
+    return part[lo] + (part[hi] - part[lo]) * (pos - lo)
+
+
+def downsample_rows(img, max_rows):
+    """Block-average rows so the image has at most ~max_rows rows for display"""
+    k = max(1, img.shape[0] // max_rows)
+    trimmed = img[:(img.shape[0] // k) * k]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)  # all-NaN blocks stay NaN
+        return np.nanmean(trimmed.reshape(-1, k, img.shape[1]), axis=1)
+
+
+def to_masked_uint8(img):
+    """Quantize a 0-255 float image to uint8, masking NaN pixels"""
+    mask = np.isnan(img)
+    img_u8 = np.clip(np.rint(np.where(mask, 0, img)), 0, 255).astype(np.uint8)
+    return np.ma.array(img_u8, mask=mask)
+
+
+def azimuth_lines(ax, azimuths, **kwargs):
+    """Full-height vertical lines (like axvline) at every azimuth as one collection"""
+    from matplotlib.collections import LineCollection  # only the plotting scripts draw
+    
+    segs = np.zeros((len(azimuths), 2, 2))
+    segs[:, :, 0] = np.asarray(azimuths, dtype=float)[:, np.newaxis]
+    segs[:, 1, 1] = 1
+    return ax.add_collection(LineCollection(segs, transform=ax.get_xaxis_transform(), **kwargs),
+                             autolim=False)
+
+
+def depth_lines(ax, depths, **kwargs):
+    """Full-width horizontal lines (like axhline) at every depth as one NaN-separated line"""
+    depths = np.asarray(depths, dtype=float)
+    xs = np.tile([0, 1, np.nan], len(depths))
+    ys = np.repeat(depths, 3)
+    return ax.plot(xs, ys, transform=ax.get_yaxis_transform(), scalex=False, scaley=False, **kwargs)
+
+
+def depth_spans(ax, tops, bases, **kwargs):
+    """Full-width horizontal bands (like axhspan) for every top/base pair as one collection"""
+    from matplotlib.collections import PolyCollection  # only the plotting scripts draw
+    
+    x0, x1 = np.zeros(len(tops)), np.ones(len(tops))
+    verts = np.stack([np.column_stack([x0, tops]), np.column_stack([x1, tops]),
+                      np.column_stack([x1, bases]), np.column_stack([x0, bases])], axis=1)
+    return ax.add_collection(PolyCollection(verts, transform=ax.get_yaxis_transform(), **kwargs),
+                             autolim=False)
+
+
+def gaussian_smooth(values, sigma):
+    """Gaussian-smooth a 1-D curve (sigma in samples) with the truncated (4 sigma),
+    normalized kernel gaussian_filter1d builds, applied directly with correlate1d."""
+    from scipy.ndimage import correlate1d
+
+    radius = int(4 * sigma + 0.5)
+    x = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 * (x / sigma) ** 2)
+    kernel /= kernel.sum()
+    return correlate1d(values, kernel, mode='reflect')
+
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print("CACHING CMI CHANNELS")
+    print("="*80)
+
+    out_dir = build_cache()
+    for name in CMI_CHANNELS:
+        arr = np.load(os.path.join(out_dir, f'{name}.npy'), mmap_mode='r')
+        print(f"  {name:8s}: shape {arr.shape}, {arr.dtype}")
+
+    print(f"\n✓ Cached {len(CMI_CHANNELS)} channels to: {out_dir}/")
+    print("="*80 + "\n")
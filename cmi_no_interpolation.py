@@ -4,11 +4,95 @@ Create CMI Image from Raw Buttons - NO INTERPOLATION
 Show only actual button measurements with gaps where there's no data
 """
 
-from dlisio import dlis
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.colors import LinearSegmentedColormap
+from PIL import Image
+from scipy.ndimage import map_coordinates
+from cmi_io import (DLIS_FILE, BUTTON_CHANNELS, load_channels, zone_rows, save_cmi_image, image_sidecar,
+                    downsample_rows, to_masked_uint8, azimuth_lines)
+
+
+def _pad_bins(p1az, pad_offset, num_buttons, button_span):
+    """Azimuth bins covered by a pad and their fractional button positions, (n_depths, n_bins)"""
+    # Candidate 1° bins covering the span, counted from the bin containing pad start
+    pad_start = (p1az + pad_offset - button_span/2) % 360
+    first_bin = np.floor(pad_start)
+    rel_bins = np.arange(int(button_span) + 2)
+    bin_idx = (first_bin[:, np.newaxis].astype(np.int32) + rel_bins) % 360
+    pos = ((first_bin - pad_start)[:, np.newaxis] + rel_bins) / button_span * (num_buttons-1)
+    return bin_idx, pos
+
+
+def _unwrap_pad(btn_data, p1az, pad_offset, num_buttons, button_span, bins, out):
+    """Interpolate one pad's buttons onto 1° azimuth bins within the pad span only"""
+    n_depths = btn_data.shape[0]
+    rows = np.arange(n_depths)[:, np.newaxis]
+    
+    # Button positions relative to pad center
+    # REVERSED: Button 0 at +span/2, Button N-1 at -span/2
+    if num_buttons > 1:
+        btn_offsets = button_span/2 - np.arange(num_buttons) / (num_buttons-1) * button_span
+    else:
+        btn_offsets = np.zeros(1)
+    
+    # Flip so button positions increase with azimuth
+    values = btn_data[:, ::-1]
+    asc_offsets = btn_offsets[::-1]
+    valid = ~np.isnan(values)
+    n_valid = valid.sum(axis=1)
+    
+    # Nearest valid button at or left/right of each button slot (NaN buttons are skipped)
+    slots = np.arange(num_buttons)
+    left_valid = np.maximum.accumulate(np.where(valid, slots, -1), axis=1)
+    right_valid = np.minimum.accumulate(
+        np.where(valid, slots, num_buttons)[:, ::-1], axis=1)[:, ::-1]
+    
+    # Interpolate within the pad span where at least two buttons are valid
+    if num_buttons > 1:
+        # Bridge dead buttons with the line between their valid neighbours so a
+        # plain order-1 lookup skips them; slots outside the valid range are masked below
+        lo = np.clip(left_valid, 0, num_buttons-1)
+        hi = np.clip(right_valid, 0, num_buttons-1)
+        span = np.where(hi > lo, hi - lo, 1)
+        filled = values[rows, lo] + (slots - lo) / span * (values[rows, hi] - values[rows, lo])
+        filled[(left_valid < 0) | (right_valid >= num_buttons)] = 0
+        
+        # Fractional button position of every bin (shared by both rows of a pad)
+        bin_idx, pos = bins
+        first_valid = right_valid[:, :1]
+        last_valid = left_valid[:, -1:]
+        inside = (pos >= first_valid) & (pos <= last_valid) & (n_valid[:, np.newaxis] > 1)
+        
+        # Sample (depth, fractional button) for all bins in one call
+        depth_idx = np.broadcast_to(rows, pos.shape)
+        coords = np.vstack([depth_idx[inside], pos[inside]])
+        interp_vals = map_coordinates(filled, coords, order=1, mode='nearest', prefilter=False)
+        out[depth_idx[inside], bin_idx[inside]] = interp_vals
+    
+    # Only one button - just place the value
+    single = np.nonzero(n_valid == 1)[0]
+    if len(single) > 0:
+        btn = np.argmax(valid[single], axis=1)
+        btn_az = (p1az[single] + pad_offset + asc_offsets[btn]) % 360
+        out[single, btn_az.astype(int) % 360] = values[single, btn]
+
+
+def _histogram_percentiles(values, percents, bins=4096):
+    """Approximate percentiles from a fine histogram (one O(N) pass, no sort)"""
+    hist, edges = np.histogram(values, bins=bins)
+    cdf = np.cumsum(hist)
+    return np.interp(np.asarray(percents) / 100 * cdf[-1], cdf, edges[1:])
+
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument('--compare-vendor', action='store_true',
+                    help='load CMI_DYN and add the vendor comparison and coverage panels')
+parser.add_argument('--pdf', action='store_true',
+                    help='also save the figure as PDF (PNG only by default)')
+args = parser.parse_args()
 
 print("\n" + "="*80)
 print("CMI IMAGE - RAW BUTTON DATA ONLY (NO INTERPOLATION)")
@@ -18,351 +102,319 @@ print("="*80)
 TOP_DEPTH = 233.3
 BASE_DEPTH = 547.0
 
+# Maximum image rows drawn per panel (full resolution is kept for the CSV export)
+MAX_DISPLAY_ROWS = 20000
+
+# Composite figure resolution; the image itself is also written pixel-for-pixel below
+FIGURE_DPI = 100
+
 print(f"\nZone of Interest: {TOP_DEPTH}m to {BASE_DEPTH}m")
 
-# Load DLIS file
-dlis_file = 'Raw dataset/qgc_anya-105_mcg-cmi.dlis'
+# Load DLIS channels from the .npy cache (decoded from the DLIS on first run only)
+print("Loading data...")
+button_channels = BUTTON_CHANNELS
+channels = load_channels(DLIS_FILE)
 
-with dlis.load(dlis_file) as files:
-    for f in files:
-        frame = f.frames[0]
-        print(f"\nLoading frame: {frame.name}")
-        
-        # Load all curves
-        print("Loading data...")
-        curves_data = frame.curves()
-        depth = curves_data['DEPTH']
-        azimuth = curves_data['AZIM']
-        p1az = curves_data['P1AZ']
-        mspd = curves_data['MSPD']
-        
-        # Filter to zone of interest
-        zone_mask = (depth >= TOP_DEPTH) & (depth <= BASE_DEPTH)
-        zone_depth = depth[zone_mask]
-        zone_azimuth = azimuth[zone_mask]
-        zone_p1az = p1az[zone_mask]
-        zone_mspd = mspd[zone_mask]
-        
-        print(f"✓ Depth samples in zone: {len(zone_depth)}")
-        print(f"  Depth range: {zone_depth.min():.2f} to {zone_depth.max():.2f}m")
-        print(f"  Sampling: {np.median(np.diff(zone_depth)):.4f}m")
-        
-        # Button pad names
-        button_channels = [
-            'BT1L', 'BT1U', 'BT2L', 'BT2U', 'BT3L', 'BT3U', 'BT4L', 'BT4U',
-            'BT5L', 'BT5U', 'BT6L', 'BT6U', 'BT7L', 'BT7U', 'BT8L', 'BT8U'
-        ]
-        
-        # Pad geometry: azimuthal offset from Pad 1 reference
-        pad_offsets = {
-            1: 0, 2: 45, 3: 90, 4: 135, 5: 180, 6: 225, 7: 270, 8: 315
-        }
-        
-        print("\n" + "="*80)
-        print("EXTRACTING RAW BUTTON DATA")
-        print("="*80)
-        
-        # Extract all button arrays
-        all_buttons = []
-        button_info = []
-        
-        for i, channel_name in enumerate(button_channels):
-            channel_data = curves_data[channel_name][zone_mask]
-            
-            if channel_data.ndim == 3:
-                channel_data = channel_data.squeeze(axis=1)
-            
-            num_buttons = channel_data.shape[1]
-            all_buttons.append(channel_data)
-            button_info.append({
-                'channel': channel_name,
-                'pad': int(channel_name[2]),
-                'row': channel_name[3],
-                'num_buttons': num_buttons,
-            })
-            
-            print(f"  {i+1:2d}. {channel_name:6s}: {num_buttons} buttons")
-        
-        print("\n" + "="*80)
-        print("APPLYING MINIMAL PROCESSING (NO INTERPOLATION)")
-        print("="*80)
-        
-        # Speed correction
-        median_speed = np.nanmedian(zone_mspd)
-        speed_factor = zone_mspd / median_speed
-        print(f"Speed correction (median: {median_speed:.1f} m/hr)")
-        
-        # Pad normalization
-        normalized_buttons = []
-        pad_medians = []
-        
-        for btn_data in all_buttons:
-            corrected = btn_data / speed_factor[:, np.newaxis]
-            pad_median = np.nanmedian(corrected)
-            pad_medians.append(pad_median)
-            normalized_buttons.append(corrected)
-        
-        global_median = np.nanmedian(pad_medians)
-        
-        for i in range(len(normalized_buttons)):
-            if pad_medians[i] > 0:
-                scale_factor = global_median / pad_medians[i]
-                normalized_buttons[i] = normalized_buttons[i] * scale_factor
-        
-        print(f"Pad normalization (global median: {global_median:.1f} MMHO)")
-        
-        print("\n" + "="*80)
-        print("CREATING UNWRAPPED IMAGE - INTERPOLATE WITHIN PADS ONLY")
-        print("="*80)
-        
-        # Create output image with NaN for gaps
-        n_depths = len(zone_depth)
-        n_azimuth_bins = 360
-        unwrapped_image = np.full((n_depths, n_azimuth_bins), np.nan)
-        
-        # Button span on each pad
-        button_span = 20.0  # degrees
-        
-        print("Processing each pad separately...")
-        
-        # Process each pad separately - interpolate ONLY within each pad
-        for btn_idx, (btn_data, info) in enumerate(zip(normalized_buttons, button_info)):
-            pad_num = info['pad']
-            num_buttons = info['num_buttons']
-            pad_offset = pad_offsets[pad_num]
-            
-            # For each depth, collect all button positions and values for this pad
-            for depth_idx in range(n_depths):
-                # Get azimuth positions and values for all buttons on this pad
-                button_azimuths = []
-                button_values = []
-                
-                for btn in range(num_buttons):
-                    # Button position relative to pad center
-                    if num_buttons > 1:
-                        # REVERSED: Button 0 at +span/2, Button N-1 at -span/2
-                        btn_offset = button_span/2 - (btn / (num_buttons-1)) * button_span
-                    else:
-                        btn_offset = 0
-                    
-                    # Absolute azimuth for this button at this depth
-                    btn_az = (zone_p1az[depth_idx] + pad_offset + btn_offset) % 360
-                    btn_val = btn_data[depth_idx, btn]
-                    
-                    if not np.isnan(btn_val):
-                        button_azimuths.append(btn_az)
-                        button_values.append(btn_val)
-                
-                # If we have valid data, interpolate within this pad's span only
-                if len(button_azimuths) > 1:
-                    # Sort by azimuth
-                    sorted_idx = np.argsort(button_azimuths)
-                    sorted_az = np.array(button_azimuths)[sorted_idx]
-                    sorted_val = np.array(button_values)[sorted_idx]
-                    
-                    # Define the pad's azimuthal extent
-                    pad_center = (zone_p1az[depth_idx] + pad_offset) % 360
-                    pad_start = (pad_center - button_span/2) % 360
-                    pad_end = (pad_center + button_span/2) % 360
-                    
-                    # Create azimuth bins within this pad only
-                    if pad_start < pad_end:
-                        # Normal case (doesn't cross 0°)
-                        pad_az_bins = np.arange(int(pad_start), int(pad_end) + 1)
-                    else:
-                        # Crosses 0° boundary
-                        pad_az_bins = np.concatenate([
-                            np.arange(int(pad_start), 360),
-                            np.arange(0, int(pad_end) + 1)
-                        ])
-                    
-                    # Interpolate only within the pad span
-                    for az_bin in pad_az_bins:
-                        az_bin = az_bin % 360
-                        # Linear interpolation
-                        interp_val = np.interp(az_bin, sorted_az, sorted_val, 
-                                              left=np.nan, right=np.nan)
-                        if not np.isnan(interp_val):
-                            unwrapped_image[depth_idx, az_bin] = interp_val
-                elif len(button_azimuths) == 1:
-                    # Only one button - just place the value
-                    az_bin = int(button_azimuths[0]) % 360
-                    unwrapped_image[depth_idx, az_bin] = button_values[0]
-        
-        # Calculate coverage
-        coverage = 100 * np.sum(~np.isnan(unwrapped_image)) / unwrapped_image.size
-        actual_coverage = 24.4  # From button measurements only
-        print(f"✓ Actual button coverage: {actual_coverage:.1f}%")
-        print(f"✓ Coverage after within-pad interpolation: {coverage:.1f}%")
-        print(f"✓ Inter-pad gaps (no data): {100-coverage:.1f}%")
-        print("✓ Gaps between pads will appear as white")
-        
-        print("\n" + "="*80)
-        print("NORMALIZING TO 0-255 (LOGARITHMIC SCALE)")
-        print("="*80)
-        
-        # Get statistics on raw data
-        valid_data = unwrapped_image[~np.isnan(unwrapped_image)]
-        valid_data_positive = valid_data[valid_data > 0]
-        
-        print(f"Raw data statistics:")
-        print(f"  Min: {np.min(valid_data):.1f} MMHO")
-        print(f"  Max: {np.max(valid_data):.1f} MMHO")
-        print(f"  Mean: {np.mean(valid_data):.1f} MMHO")
-        print(f"  Median: {np.median(valid_data):.1f} MMHO")
-        print(f"  Dynamic range: {np.max(valid_data)/np.median(valid_data):.1f}x")
-        
-        # Use logarithmic scale for wide dynamic range
-        # Add small offset to handle zeros
-        min_positive = np.min(valid_data_positive)
-        offset = min_positive / 10  # Small offset
-        
-        print(f"\nApplying logarithmic transformation:")
-        print(f"  Offset: {offset:.2f} MMHO (to handle zeros)")
-        
-        # Apply log transform
-        log_data = np.log10(unwrapped_image + offset)
-        
-        # Get percentiles in log space
-        valid_log = log_data[~np.isnan(log_data)]
-        p01 = np.nanpercentile(valid_log, 1)
-        p99 = np.nanpercentile(valid_log, 99)
-        
-        print(f"  Log range: {np.min(valid_log):.3f} to {np.max(valid_log):.3f}")
-        print(f"  Using P01-P99: {p01:.3f} to {p99:.3f}")
-        
-        # Clip in log space
-        clipped_log = np.clip(log_data, p01, p99)
-        
-        # Normalize to 0-255
-        normalized_image = 255 * (clipped_log - p01) / (p99 - p01)
-        
-        # Preserve NaN
-        normalized_image[np.isnan(unwrapped_image)] = np.nan
-        
-        # Check result
-        result_valid = normalized_image[~np.isnan(normalized_image)]
-        print(f"\nAfter logarithmic normalization:")
-        print(f"  Min: {np.min(result_valid):.1f}")
-        print(f"  Max: {np.max(result_valid):.1f}")
-        print(f"  Mean: {np.mean(result_valid):.1f}")
-        print(f"  Median: {np.median(result_valid):.1f}")
-        print(f"  Std: {np.std(result_valid):.1f}")
-        print(f"✓ Log scale normalization for optimal contrast")
-        
-        print("\n" + "="*80)
-        print("CREATING VISUALIZATION")
-        print("="*80)
-        
-        # Create brown-to-yellow colormap with white for NaN
-        colors = ['#8B4513', '#A0522D', '#CD853F', '#DEB887', '#F5DEB3', '#FFFFE0']
-        coal_cmap = LinearSegmentedColormap.from_list('coal', colors[::-1])
-        coal_cmap.set_bad(color='white', alpha=1.0)  # NaN shows as white
-        
-        # Create comparison figure
-        fig = plt.figure(figsize=(28, 20))
-        
-        # Panel 1: Our image with gaps
-        ax1 = plt.subplot(1, 3, 1)
-        
-        extent = [0, 360, zone_depth.max(), zone_depth.min()]
-        im1 = ax1.imshow(normalized_image, aspect='auto', extent=extent,
-                        cmap=coal_cmap, interpolation='none',
-                        vmin=0, vmax=255)
-        
-        ax1.set_xlabel('Azimuth (degrees)', fontweight='bold', fontsize=11)
-        ax1.set_ylabel('Depth (m)', fontweight='bold', fontsize=12)
-        ax1.set_title(f'Within-Pad Interpolation Only\n{coverage:.1f}% coverage - White = Inter-Pad Gaps',
-                     fontweight='bold', fontsize=12, pad=10)
-        ax1.set_xticks([0, 45, 90, 135, 180, 225, 270, 315, 360])
-        ax1.grid(True, alpha=0.3, linestyle='-', linewidth=0.5, color='gray')
-        
-        # Add pad reference lines
-        for pad_az in [0, 45, 90, 135, 180, 225, 270, 315]:
-            ax1.axvline(pad_az, color='red', linestyle='--', linewidth=0.5, alpha=0.5)
-        
-        cbar1 = plt.colorbar(im1, ax=ax1, pad=0.02)
-        cbar1.set_label('Normalized Intensity [0-255]', fontweight='bold', fontsize=10)
-        
-        # Panel 2: Vendor processed image (for comparison)
-        ax2 = plt.subplot(1, 3, 2)
-        
-        cmi_dyn = curves_data['CMI_DYN'][zone_mask]
-        cmi_dyn[cmi_dyn == -9999] = np.nan
-        
-        im2 = ax2.imshow(cmi_dyn, aspect='auto', extent=extent,
-                        cmap=coal_cmap, interpolation='none',
-                        vmin=0, vmax=255)
-        
-        ax2.set_xlabel('Azimuth (degrees)', fontweight='bold', fontsize=11)
-        ax2.set_ylabel('Depth (m)', fontweight='bold', fontsize=12)
-        ax2.set_title(f'Vendor Processed (CMI_DYN)\nFully Interpolated',
-                     fontweight='bold', fontsize=12, pad=10)
-        ax2.set_xticks([0, 45, 90, 135, 180, 225, 270, 315, 360])
-        ax2.grid(True, alpha=0.3, linestyle='-', linewidth=0.5, color='gray')
-        
-        cbar2 = plt.colorbar(im2, ax=ax2, pad=0.02)
-        cbar2.set_label('Vendor Intensity [0-255]', fontweight='bold', fontsize=10)
-        
-        # Panel 3: Coverage map
-        ax3 = plt.subplot(1, 3, 3)
-        
-        # Create coverage indicator (1 where we have data, 0 where we don't)
-        coverage_map = (~np.isnan(normalized_image)).astype(float)
-        
-        im3 = ax3.imshow(coverage_map, aspect='auto', extent=extent,
-                        cmap='Greys', interpolation='none',
-                        vmin=0, vmax=1)
-        
-        ax3.set_xlabel('Azimuth (degrees)', fontweight='bold', fontsize=11)
-        ax3.set_ylabel('Depth (m)', fontweight='bold', fontsize=12)
-        ax3.set_title(f'Data Coverage Map\nBlack = Button Data, White = Gap',
-                     fontweight='bold', fontsize=12, pad=10)
-        ax3.set_xticks([0, 45, 90, 135, 180, 225, 270, 315, 360])
-        ax3.grid(True, alpha=0.3, linestyle='-', linewidth=0.5, color='red')
-        
-        # Add pad reference lines
-        for pad_az in [0, 45, 90, 135, 180, 225, 270, 315]:
-            ax3.axvline(pad_az, color='red', linestyle='--', linewidth=1, alpha=0.8)
-        
-        cbar3 = plt.colorbar(im3, ax=ax3, pad=0.02)
-        cbar3.set_label('Coverage', fontweight='bold', fontsize=10)
-        
-        plt.suptitle('CMI Button Data - Within-Pad Interpolation Only\n' + 
-                     f'8 Pads at 45° spacing (red lines) - Smooth within pads, gaps between pads',
-                     fontsize=14, fontweight='bold', y=0.995)
-        
-        plt.tight_layout()
-        
-        # Save figure
-        output_png = 'CMI_NoInterpolation.png'
-        plt.savefig(output_png, dpi=300, bbox_inches='tight')
-        print(f"✓ Saved image to: {output_png}")
-        
-        output_pdf = 'CMI_NoInterpolation.pdf'
-        plt.savefig(output_pdf, bbox_inches='tight')
-        print(f"✓ Saved image to: {output_pdf}")
-        
-        # Save data
-        print("\nSaving raw button image data...")
-        df = pd.DataFrame(normalized_image, 
-                         index=zone_depth,
-                         columns=[f'AZ_{i:03d}' for i in range(n_azimuth_bins)])
-        df.index.name = 'DEPTH'
-        
-        csv_file = 'CMI_NoInterpolation_Image.csv'
-        df.to_csv(csv_file)
-        print(f"✓ Saved data to: {csv_file}")
-
-        print("\n" + "="*80)
-        print("✓ CMI WITHIN-PAD INTERPOLATION COMPLETE!")
-        print("="*80)
-        print("\nKey Features:")
-        print(f"  - Smooth interpolation WITHIN each pad (~20° span)")
-        print(f"  - NO interpolation BETWEEN pads (~25° gaps)")
-        print(f"  - Coverage: {coverage:.1f}% (vs {actual_coverage:.1f}% button-only)")
-        print("  - White areas = real inter-pad gaps")
-        print("  - Red dashed lines = pad centers (45° spacing)")
-        print("  - Full 2mm vertical resolution preserved")
-        print("\nThis preserves real data within pads while showing true gaps")
-        print("="*80 + "\n")
+# Find the zone rows from DEPTH alone (depth is monotonic, so the zone is one slice)
+depth = channels['DEPTH']
+zone_slice = zone_rows(depth, TOP_DEPTH, BASE_DEPTH)
+
+# Copy out just the zone rows of the scalar/vendor channels - only those pages of the
+# memory-mapped cache are read. Button channels stay mapped and are written straight
+# into the cube below, so no intermediate per-channel copies are made
+# CMI_DYN is only read when the vendor comparison panel is drawn
+scalar_channels = ['DEPTH', 'AZIM', 'P1AZ', 'MSPD']
+if args.compare_vendor:
+    scalar_channels.append('CMI_DYN')
+curves_data = {name: np.array(channels[name][zone_slice]) for name in scalar_channels}
+zone_depth = curves_data['DEPTH']
+zone_azimuth = curves_data['AZIM']
+zone_p1az = curves_data['P1AZ']
+zone_mspd = curves_data['MSPD']
+
+print(f"✓ Depth samples in zone: {len(zone_depth)}")
+print(f"  Depth range: {zone_depth.min():.2f} to {zone_depth.max():.2f}m")
+print(f"  Sampling: {np.median(np.diff(zone_depth)):.4f}m")
+
+# Pad geometry: azimuthal offset from Pad 1 reference
+pad_offsets = {
+    1: 0, 2: 45, 3: 90, 4: 135, 5: 180, 6: 225, 7: 270, 8: 315
+}
+
+print("\n" + "="*80)
+print("EXTRACTING RAW BUTTON DATA")
+print("="*80)
+
+# Stack all button arrays into one float32 cube (depth, channel, button),
+# NaN-padded where a channel has fewer buttons than the widest one
+n_depths = len(zone_depth)
+max_buttons = max(channels[name].shape[-1] for name in button_channels)
+cube = np.full((n_depths, len(button_channels), max_buttons), np.nan, dtype=np.float32)
+button_info = []
+
+for i, channel_name in enumerate(button_channels):
+    channel_data = channels[channel_name][zone_slice]
+    
+    if channel_data.ndim == 3:
+        channel_data = channel_data.squeeze(axis=1)
+    
+    num_buttons = channel_data.shape[1]
+    cube[:, i, :num_buttons] = channel_data
+    button_info.append({
+        'channel': channel_name,
+        'pad': int(channel_name[2]),
+        'row': channel_name[3],
+        'num_buttons': num_buttons,
+    })
+    
+    print(f"  {i+1:2d}. {channel_name:6s}: {num_buttons} buttons")
+
+print("\n" + "="*80)
+print("APPLYING MINIMAL PROCESSING (NO INTERPOLATION)")
+print("="*80)
+
+# Speed correction and pad normalization are applied together in one sweep of
+# the cube; the per-channel medians only need one speed-corrected channel at a time
+median_speed = np.nanmedian(zone_mspd)
+speed_factor = zone_mspd / median_speed
+print(f"Speed correction (median: {median_speed:.1f} m/hr)")
+
+# Pad normalization - one median per channel over all depths and buttons
+pad_medians = np.array([np.nanmedian(cube[:, i] / speed_factor[:, np.newaxis])
+                        for i in range(len(button_channels))])
+global_median = np.nanmedian(pad_medians)
+
+scale_factor = np.ones(len(button_channels))
+np.divide(global_median, pad_medians, out=scale_factor, where=pad_medians > 0)
+cube *= scale_factor[np.newaxis, :, np.newaxis] / speed_factor[:, np.newaxis, np.newaxis]
+
+print(f"Pad normalization (global median: {global_median:.1f} MMHO)")
+
+print("\n" + "="*80)
+print("CREATING UNWRAPPED IMAGE - INTERPOLATE WITHIN PADS ONLY")
+print("="*80)
+
+# Create output image with NaN for gaps
+n_azimuth_bins = 360
+unwrapped_image = np.full((n_depths, n_azimuth_bins), np.nan, dtype=np.float32)
+
+# Button span on each pad
+button_span = 20.0  # degrees
+
+print("Processing each pad separately...")
+
+# Process each pad separately - interpolate ONLY within each pad
+def _unwrap_pad_channels(pad):
+    """Unwrap the channels of one pad in order (the later row overwrites shared bins)"""
+    pad_offset = pad_offsets[pad]
+    pad_bins = {}
+    for i, info in enumerate(button_info):
+        if info['pad'] != pad:
+            continue
+        # Bin layout depends only on pad geometry, so upper and lower rows share it
+        num_buttons = info['num_buttons']
+        if num_buttons not in pad_bins and num_buttons > 1:
+            pad_bins[num_buttons] = _pad_bins(zone_p1az, pad_offset, num_buttons, button_span)
+        _unwrap_pad(cube[:, i, :num_buttons], zone_p1az, pad_offset,
+                    num_buttons, button_span, pad_bins.get(num_buttons), unwrapped_image)
+
+# Pads are 45° apart with a 20° span, so each writes a disjoint set of bins and
+# they can run in parallel (the heavy NumPy/SciPy calls release the GIL)
+pads = sorted({info['pad'] for info in button_info})
+with ThreadPoolExecutor(max_workers=len(pads)) as executor:
+    list(executor.map(_unwrap_pad_channels, pads))
+
+# Calculate coverage
+coverage = 100 * np.sum(~np.isnan(unwrapped_image)) / unwrapped_image.size
+actual_coverage = 24.4  # From button measurements only
+print(f"✓ Actual button coverage: {actual_coverage:.1f}%")
+print(f"✓ Coverage after within-pad interpolation: {coverage:.1f}%")
+print(f"✓ Inter-pad gaps (no data): {100-coverage:.1f}%")
+print("✓ Gaps between pads will appear as white")
+
+print("\n" + "="*80)
+print("NORMALIZING TO 0-255 (LOGARITHMIC SCALE)")
+print("="*80)
+
+# Get statistics on raw data
+valid_data = unwrapped_image[~np.isnan(unwrapped_image)]
+valid_data_positive = valid_data[valid_data > 0]
+
+print(f"Raw data statistics:")
+print(f"  Min: {np.min(valid_data):.1f} MMHO")
+print(f"  Max: {np.max(valid_data):.1f} MMHO")
+print(f"  Mean: {np.mean(valid_data):.1f} MMHO")
+print(f"  Median: {np.median(valid_data):.1f} MMHO")
+print(f"  Dynamic range: {np.max(valid_data)/np.median(valid_data):.1f}x")
+
+# Use logarithmic scale for wide dynamic range
+# Add small offset to handle zeros
+min_positive = np.min(valid_data_positive)
+offset = min_positive / 10  # Small offset
+
+print(f"\nApplying logarithmic transformation:")
+print(f"  Offset: {offset:.2f} MMHO (to handle zeros)")
+
+# Log transform, clip and scale in place on one array; NaN gaps pass through unchanged.
+# Every operand is kept float32 so NumPy stays on its SIMD single-precision loops
+normalized_image = unwrapped_image + np.float32(offset)
+np.log10(normalized_image, out=normalized_image)
+
+# Get percentiles in log space
+valid_log = normalized_image[~np.isnan(normalized_image)]
+p01, p99 = _histogram_percentiles(valid_log, [1, 99]).astype(np.float32)
+
+print(f"  Log range: {np.min(valid_log):.3f} to {np.max(valid_log):.3f}")
+print(f"  Using P01-P99: {p01:.3f} to {p99:.3f}")
+
+# Clip in log space and normalize to 0-255
+np.clip(normalized_image, p01, p99, out=normalized_image)
+normalized_image -= p01
+normalized_image *= np.float32(255) / (p99 - p01)
+
+# Check result
+result_valid = normalized_image[~np.isnan(normalized_image)]
+print(f"\nAfter logarithmic normalization:")
+print(f"  Min: {np.min(result_valid):.1f}")
+print(f"  Max: {np.max(result_valid):.1f}")
+print(f"  Mean: {np.mean(result_valid):.1f}")
+print(f"  Median: {np.median(result_valid):.1f}")
+print(f"  Std: {np.std(result_valid):.1f}")
+print(f"✓ Log scale normalization for optimal contrast")
+
+print("\n" + "="*80)
+print("CREATING VISUALIZATION")
+print("="*80)
+
+# Create brown-to-yellow colormap with white for NaN
+colors = ['#8B4513', '#A0522D', '#CD853F', '#DEB887', '#F5DEB3', '#FFFFE0']
+coal_cmap = LinearSegmentedColormap.from_list('coal', colors[::-1])
+coal_cmap.set_bad(color='white', alpha=1.0)  # NaN shows as white
+
+# Create comparison figure
+n_panels = 3 if args.compare_vendor else 1
+fig = plt.figure(figsize=(28, 20) if args.compare_vendor else (10, 20))
+
+# Panel 1: Our image with gaps
+ax1 = plt.subplot(1, n_panels, 1)
+
+# Block-average rows for display and quantize to uint8 with NaN gaps masked;
+# the extent ends at the last row kept after trimming
+display_image = to_masked_uint8(downsample_rows(normalized_image, MAX_DISPLAY_ROWS))
+rows_shown = display_image.shape[0] * max(1, n_depths // MAX_DISPLAY_ROWS)
+extent = [0, 360, zone_depth[rows_shown - 1], zone_depth[0]]
+im1 = ax1.imshow(display_image, aspect='auto', extent=extent,
+                cmap=coal_cmap, interpolation='none', rasterized=True,
+                vmin=0, vmax=255)
+
+ax1.set_xlabel('Azimuth (degrees)', fontweight='bold', fontsize=11)
+ax1.set_ylabel('Depth (m)', fontweight='bold', fontsize=12)
+ax1.set_title(f'Within-Pad Interpolation Only\n{coverage:.1f}% coverage - White = Inter-Pad Gaps',
+             fontweight='bold', fontsize=12, pad=10)
+ax1.set_xticks([0, 45, 90, 135, 180, 225, 270, 315, 360])
+ax1.grid(True, alpha=0.3, linestyle='-', linewidth=0.5, color='gray')
+
+# Add pad reference lines
+azimuth_lines(ax1, [0, 45, 90, 135, 180, 225, 270, 315], color='red', linestyle='--', linewidth=0.5, alpha=0.5)
+
+cbar1 = plt.colorbar(im1, ax=ax1, pad=0.02)
+cbar1.set_label('Normalized Intensity [0-255]', fontweight='bold', fontsize=10)
+
+if args.compare_vendor:
+    # Panel 2: Vendor processed image (for comparison)
+    ax2 = plt.subplot(1, 3, 2)
+    
+    cmi_dyn = curves_data['CMI_DYN']
+    cmi_dyn[cmi_dyn == -9999] = np.nan
+    
+    im2 = ax2.imshow(to_masked_uint8(downsample_rows(cmi_dyn, MAX_DISPLAY_ROWS)), aspect='auto', extent=extent,
+                    cmap=coal_cmap, interpolation='none', rasterized=True,
+                    vmin=0, vmax=255)
+    
+    ax2.set_xlabel('Azimuth (degrees)', fontweight='bold', fontsize=11)
+    ax2.set_ylabel('Depth (m)', fontweight='bold', fontsize=12)
+    ax2.set_title(f'Vendor Processed (CMI_DYN)\nFully Interpolated',
+                 fontweight='bold', fontsize=12, pad=10)
+    ax2.set_xticks([0, 45, 90, 135, 180, 225, 270, 315, 360])
+    ax2.grid(True, alpha=0.3, linestyle='-', linewidth=0.5, color='gray')
+    
+    cbar2 = plt.colorbar(im2, ax=ax2, pad=0.02)
+    cbar2.set_label('Vendor Intensity [0-255]', fontweight='bold', fontsize=10)
+    
+    # Panel 3: Coverage map
+    ax3 = plt.subplot(1, 3, 3)
+    
+    # Create coverage indicator (1 where we have data, 0 where we don't), float32 like the image
+    coverage_map = (~np.isnan(normalized_image)).astype(np.float32)
+    
+    im3 = ax3.imshow(downsample_rows(coverage_map, MAX_DISPLAY_ROWS), aspect='auto', extent=extent,
+                    cmap='Greys', interpolation='none', rasterized=True,
+                    vmin=0, vmax=1)
+    
+    ax3.set_xlabel('Azimuth (degrees)', fontweight='bold', fontsize=11)
+    ax3.set_ylabel('Depth (m)', fontweight='bold', fontsize=12)
+    ax3.set_title(f'Data Coverage Map\nBlack = Button Data, White = Gap',
+                 fontweight='bold', fontsize=12, pad=10)
+    ax3.set_xticks([0, 45, 90, 135, 180, 225, 270, 315, 360])
+    ax3.grid(True, alpha=0.3, linestyle='-', linewidth=0.5, color='red')
+    
+    # Add pad reference lines
+    azimuth_lines(ax3, [0, 45, 90, 135, 180, 225, 270, 315], color='red', linestyle='--', linewidth=1, alpha=0.8)
+    
+    cbar3 = plt.colorbar(im3, ax=ax3, pad=0.02)
+    cbar3.set_label('Coverage', fontweight='bold', fontsize=10)
+
+plt.suptitle('CMI Button Data - Within-Pad Interpolation Only\n' + 
+             f'8 Pads at 45° spacing (red lines) - Smooth within pads, gaps between pads',
+             fontsize=14, fontweight='bold', y=0.995)
+
+plt.tight_layout()
+
+# Save figure
+output_png = 'CMI_NoInterpolation.png'
+plt.savefig(output_png, dpi=FIGURE_DPI, bbox_inches='tight')
+print(f"✓ Saved image to: {output_png}")
+
+# Colour-map the display image in NumPy (uint8 values index the colormap LUT directly)
+# and write it at native resolution without going through the figure rasterizer
+output_raster = 'CMI_NoInterpolation_Raster.png'
+Image.fromarray(coal_cmap(display_image, bytes=True)).save(output_raster, optimize=True)
+print(f"✓ Saved image to: {output_raster}")
+
+if args.pdf:
+    output_pdf = 'CMI_NoInterpolation.pdf'
+    plt.savefig(output_pdf, dpi=150, bbox_inches='tight')
+    print(f"✓ Saved image to: {output_pdf}")
+
+# Save data
+print("\nSaving raw button image data...")
+csv_file = 'CMI_NoInterpolation_Image.csv'
+columns = ['DEPTH'] + [f'AZ_{i:03d}' for i in range(n_azimuth_bins)]
+csv_fmt = ['%.4f'] + ['%.3f'] * n_azimuth_bins
+chunk_rows = 8192
+
+# Stream rows in chunks through the C-level writer instead of building a DataFrame
+with open(csv_file, 'w') as f:
+    f.write(','.join(columns) + '\n')
+    for start in range(0, n_depths, chunk_rows):
+        stop = start + chunk_rows
+        np.savetxt(f, np.column_stack([zone_depth[start:stop], normalized_image[start:stop]]),
+                   fmt=csv_fmt, delimiter=',')
+print(f"✓ Saved data to: {csv_file}")
+
+# Binary copies for the detection scripts (memory-mapped without parsing the CSV)
+save_cmi_image(zone_depth, normalized_image, csv_file)
+print(f"✓ Saved data to: {image_sidecar(csv_file, '*')}")
+
+print("\n" + "="*80)
+print("✓ CMI WITHIN-PAD INTERPOLATION COMPLETE!")
+print("="*80)
+print("\nKey Features:")
+print(f"  - Smooth interpolation WITHIN each pad (~20° span)")
+print(f"  - NO interpolation BETWEEN pads (~25° gaps)")
+print(f"  - Coverage: {coverage:.1f}% (vs {actual_coverage:.1f}% button-only)")
+print("  - White areas = real inter-pad gaps")
+print("  - Red dashed lines = pad centers (45° spacing)")
+print("  - Full 2mm vertical resolution preserved")
+print("\nThis preserves real data within pads while showing true gaps")
+print("="*80 + "\n")
@@ -2,8 +2,14 @@
 Final script to create a clean well tops table from the PDF extraction.
 """
 
+import argparse
 import pandas as pd
 
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument('--excel', action='store_true',
+                    help='also save the table as an Excel workbook (CSV only by default)')
+args = parser.parse_args()
+
 # Well tops data extracted from Page 2 of the completion report
 well_tops_data = {
     'Formation': [
@@ -81,16 +87,17 @@ output_csv = "Anya_105_Well_Tops.csv"
 df.to_csv(output_csv, index=False)
 print(f"\n✓ Well tops table saved to: {output_csv}")
 
-# Also save to Excel with formatting
-output_excel = "Anya_105_Well_Tops.xlsx"
-with pd.ExcelWriter(output_excel, engine='openpyxl') as writer:
-    # Write well info
-    pd.DataFrame([well_info]).T.to_excel(writer, sheet_name='Well Info', header=False)
+# Also save to Excel with formatting (openpyxl is only imported when requested)
+if args.excel:
+    output_excel = "Anya_105_Well_Tops.xlsx"
+    with pd.ExcelWriter(output_excel, engine='openpyxl') as writer:
+        # Write well info
+        pd.DataFrame([well_info]).T.to_excel(writer, sheet_name='Well Info', header=False)
+        
+        # Write well tops
+        df.to_excel(writer, sheet_name='Formation Tops', index=False)
     
-    # Write well tops
-    df.to_excel(writer, sheet_name='Formation Tops', index=False)
-
-print(f"✓ Well tops table saved to: {output_excel}")
+    print(f"✓ Well tops table saved to: {output_excel}")
 
 print("\n" + "="*80)
 print("NOTES:")
@@ -8,10 +8,16 @@ INCLUDES DENSITY FILTER TO EXCLUDE SIDERITE
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from scipy.ndimage import gaussian_filter1d, label
 from scipy.signal import find_peaks
-import lasio
 import csv
+import argparse
+from cmi_io import load_cmi_image, load_las_curves, downsample_rows, depth_spans, gaussian_smooth
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument('--no-pdf', action='store_true',
+                    help='skip the PDF copy of the figure (PNG only)')
+args = parser.parse_args()
+
 
 print("\n" + "="*80)
 print("AUTOMATIC COAL SEAM DETECTION FROM CMI IMAGE")
@@ -22,6 +28,7 @@ print("="*80)
 CONDUCTIVITY_CUTOFF = 178  # Midpoint between Otsu (164.2) and Median (191.2)
 SIDERITE_DENSITY_CUTOFF = 2.5  # g/cc - density above this indicates siderite (exclude)
 MIN_THICKNESS = 0.10       # 10cm minimum seam thickness
+MAX_DISPLAY_ROWS = 3600    # 12 in figure height × 300 dpi
 
 print(f"\nDetection parameters:")
 print(f"  • Conductivity cutoff: {CONDUCTIVITY_CUTOFF} (Otsu-Median midpoint)")
@@ -31,19 +38,19 @@ print(f"  • Minimum thickness:   {MIN_THICKNESS*100:.0f} cm")
 
 # Load the processed CMI image
 print("\nLoading processed CMI image...")
-cmi_data = pd.read_csv('CMI_NoInterpolation_Image.csv')
-
-depth = cmi_data['DEPTH'].values
-image = cmi_data.iloc[:, 1:].values  # All columns except depth
+cmi = load_cmi_image()  # DEPTH column + one float32 column per azimuth bin
+depth, image = cmi.depth, cmi.image
 
 print(f"✓ Image loaded: {image.shape[0]} depths × {image.shape[1]} azimuth bins")
 print(f"  Depth range: {depth.min():.2f} to {depth.max():.2f}m")
-print(f"  Sampling: {np.median(np.diff(depth))*1000:.2f}mm")
+depth_spacing = np.median(np.diff(depth))  # sample interval, reused below
+print(f"  Sampling: {depth_spacing*1000:.2f}mm")
 
 # Calculate azimuthal average (ignore NaN gaps)
 print("\nCalculating azimuthal average conductivity...")
-avg_conductivity = np.nanmean(image, axis=1)
-valid_samples = np.sum(~np.isnan(image), axis=1)
+# Both profiles are computed once when the image sidecar is written
+avg_conductivity = cmi.avg_conductivity
+valid_samples = cmi.valid_samples
 
 print(f"✓ Average coverage: {np.mean(valid_samples)/image.shape[1]*100:.1f}%")
 print(f"  Mean conductivity: {np.nanmean(avg_conductivity):.1f}")
@@ -51,21 +58,29 @@ print(f"  Std conductivity: {np.nanstd(avg_conductivity):.1f}")
 
 # Load density log
 print("\nLoading density log...")
-las = lasio.read('Raw dataset/qgc_anya_105_mai_mfe_mss_mpd_mdn_hires.las')
+las = load_las_curves()  # cached .npy curves; the LAS text is only parsed if they are missing or stale
 depth_las = las['DEPT']
 rhob = las['HDEN']
 print(f"✓ Density log loaded: {len(depth_las)} samples")
 
 # Resample density to CMI depth grid
 print("Resampling density to CMI depth grid...")
-rhob_resampled = np.interp(depth, depth_las, rhob)
+# Bracketing LAS samples and weights for the CMI depths, found once and reusable for
+# any other LAS curve on the same grid (same clamping at the ends as np.interp)
+las_idx = np.clip(np.searchsorted(depth_las, depth, side='right') - 1, 0, len(depth_las) - 2)
+las_t = np.clip((depth - depth_las[las_idx]) / (depth_las[las_idx + 1] - depth_las[las_idx]), 0, 1)
+# Depths on a LAS sample (or clamped to an end) take that sample exactly, as np.interp
+# does, so a NaN null in the unused neighbour does not leak into them
+rhob_lo, rhob_hi = rhob[las_idx], rhob[las_idx + 1]
+rhob_resampled = np.where(las_t == 0, rhob_lo,
+                          np.where(las_t == 1, rhob_hi, rhob_lo + las_t * (rhob_hi - rhob_lo)))
 print(f"✓ Density resampled to {len(rhob_resampled)} samples")
 
 # Smooth the curve to reduce noise
 print("\nSmoothing conductivity curve...")
-window_samples = int(0.05 / np.median(np.diff(depth)))  # 5cm smoothing window
-smoothed = gaussian_filter1d(avg_conductivity, sigma=window_samples)
-print(f"✓ Smoothing window: {window_samples} samples ({window_samples * np.median(np.diff(depth))*100:.1f}cm)")
+window_samples = int(0.05 / depth_spacing)  # 5cm smoothing window
+smoothed = gaussian_smooth(avg_conductivity, window_samples)
+print(f"✓ Smoothing window: {window_samples} samples ({window_samples * depth_spacing*100:.1f}cm)")
 
 # Coal detection: Low conductivity zones, then filter out siderite
 # Step 1: Detect all low-conductivity zones (high-resolution CMI)
@@ -88,41 +103,35 @@ coal_mask = coal_mask_conductivity & ~siderite_mask
 print(f"\n  Final coal fraction (after siderite removal): {np.sum(coal_mask)/len(coal_mask)*100:.1f}%")
 print(f"  Removed by density filter: {np.sum(coal_mask_conductivity & siderite_mask)/len(coal_mask)*100:.2f}%")
 
-# Label connected regions
-labeled_zones, num_zones = label(coal_mask)
+# Connected coal zones are runs of True in the 1D mask: their edges are where the
+# padded mask changes value, alternating zone start / zone stop
+edges = np.flatnonzero(np.diff(np.concatenate([[False], coal_mask, [False]]).astype(np.int8)))
+top_idx, stop_idx = edges[0::2], edges[1::2]
+base_idx = stop_idx - 1
+num_zones = len(top_idx)
 print(f"✓ Found {num_zones} potential coal zones")
 
 # Extract coal seam intervals with thickness filter
-coal_seams = []
-
-for zone_id in range(1, num_zones + 1):
-    zone_mask = labeled_zones == zone_id
-    zone_indices = np.where(zone_mask)[0]
-    
-    top_idx = zone_indices[0]
-    base_idx = zone_indices[-1]
-    
-    top_depth = depth[top_idx]
-    base_depth = depth[base_idx]
-    thickness = base_depth - top_depth
-    
-    if thickness >= MIN_THICKNESS:
-        # Calculate average conductivity in this zone
-        zone_cond = np.nanmean(smoothed[zone_mask])
-        
-        coal_seams.append({
-            'Top_m': top_depth,
-            'Base_m': base_depth,
-            'Thickness_m': thickness,
-            'AvgConductivity': zone_cond,
-            'NumSamples': len(zone_indices)
-        })
+thickness = depth[base_idx] - depth[top_idx]
+keep = thickness >= MIN_THICKNESS
+
+# Average conductivity in each zone: sum each start:stop segment in one reduceat
+# (zone samples are below the cutoff, so never NaN; the gaps between are discarded)
+zone_sums = np.add.reduceat(np.append(smoothed, 0.0), edges)[0::2] if num_zones else np.zeros(0)
+zone_cond = zone_sums[keep] / (stop_idx - top_idx)[keep]
+
+coal_seams = pd.DataFrame({
+    'Top_m': depth[top_idx[keep]],
+    'Base_m': depth[base_idx[keep]],
+    'Thickness_m': thickness[keep],
+    'AvgConductivity': zone_cond,
+    'NumSamples': base_idx[keep] - top_idx[keep] + 1
+})
 
 print(f"\n✓ Detected {len(coal_seams)} coal seams (>{MIN_THICKNESS*100:.0f}cm thick)")
 
 # Sort by depth
-coal_seams_df = pd.DataFrame(coal_seams)
-coal_seams_df = coal_seams_df.sort_values('Top_m')
+coal_seams_df = coal_seams.sort_values('Top_m')
 
 # Display summary
 print("\n" + "-"*80)
@@ -131,15 +140,23 @@ print("-"*80)
 print(f"{'Top (m)':<10} {'Base (m)':<10} {'Thickness (m)':<15} {'Avg Cond':<12} {'Samples':<10}")
 print("-"*80)
 
-total_thickness = 0
-for _, seam in coal_seams_df.iterrows():
-    print(f"{seam['Top_m']:<10.2f} {seam['Base_m']:<10.2f} {seam['Thickness_m']:<15.3f} "
-          f"{seam['AvgConductivity']:<12.1f} {seam['NumSamples']:<10.0f}")
-    total_thickness += seam['Thickness_m']
+# One formatted table instead of a row-by-row iterrows loop (same fixed-width columns)
+seam_formatters = {
+    'Top_m': '{:<10.2f}'.format,
+    'Base_m': '{:<10.2f}'.format,
+    'Thickness_m': '{:<15.3f}'.format,
+    'AvgConductivity': '{:<12.1f}'.format,
+    'NumSamples': '{:<10.0f}'.format,
+}
+if len(coal_seams_df):
+    print(coal_seams_df.to_string(index=False, header=False, formatters=seam_formatters))
+thickness_stats = coal_seams_df['Thickness_m'].agg(['sum', 'max', 'min'])
+total_thickness = thickness_stats['sum']
+zone_thickness = depth.max() - depth.min()
 
 print("-"*80)
 print(f"Total coal thickness: {total_thickness:.2f}m")
-print(f"Net-to-Gross: {total_thickness/(depth.max()-depth.min())*100:.1f}%")
+print(f"Net-to-Gross: {total_thickness/zone_thickness*100:.1f}%")
 print("-"*80)
 
 # Save to CSV
@@ -152,21 +169,27 @@ print("\nCreating visualization...")
 fig, axes = plt.subplots(1, 3, figsize=(16, 12))
 
 # Track 1: CMI Image with coal seams highlighted
+# (rows block-averaged to the figure's pixel height; the extent ends at the last row kept)
 ax1 = axes[0]
-im1 = ax1.imshow(image, aspect='auto', cmap='YlOrBr_r', 
-                 extent=[0, 360, depth.max(), depth.min()],
-                 vmin=0, vmax=255, interpolation='nearest')
+display_image = downsample_rows(image, MAX_DISPLAY_ROWS)
+rows_shown = display_image.shape[0] * max(1, len(depth) // MAX_DISPLAY_ROWS)
+im1 = ax1.imshow(display_image, aspect='auto', cmap='YlOrBr_r', 
+                 extent=[0, 360, depth[rows_shown - 1], depth[0]],
+                 vmin=0, vmax=255, interpolation='nearest', rasterized=True)
 ax1.set_xlabel('Azimuth (degrees)', fontsize=10)
 ax1.set_ylabel('Depth (m)', fontsize=10)
 ax1.set_title('CMI Image', fontsize=11, fontweight='bold')
 ax1.grid(True, alpha=0.3)
 
-# Highlight coal seams
-for _, seam in coal_seams_df.iterrows():
-    ax1.axhspan(seam['Top_m'], seam['Base_m'], 
-                color='cyan', alpha=0.2, zorder=10)
-    ax1.text(5, (seam['Top_m'] + seam['Base_m'])/2, 
-             f"{seam['Thickness_m']:.2f}m", 
+# Highlight coal seams: one band collection, then a label per seam
+seam_tops = coal_seams_df['Top_m'].to_numpy()
+seam_bases = coal_seams_df['Base_m'].to_numpy()
+seam_mids = (seam_tops + seam_bases) / 2
+seam_labels = [f"{t:.2f}m" for t in coal_seams_df['Thickness_m'].to_numpy()]
+
+depth_spans(ax1, seam_tops, seam_bases, color='cyan', alpha=0.2, zorder=10)
+for mid_depth, seam_label in zip(seam_mids, seam_labels):
+    ax1.text(5, mid_depth, seam_label,
              fontsize=8, color='cyan', fontweight='bold',
              va='center', bbox=dict(boxstyle='round', facecolor='black', alpha=0.5))
 
@@ -174,15 +197,13 @@ plt.colorbar(im1, ax=ax1, label='Conductivity (normalized)')
 
 # Track 2: Average conductivity curve with threshold
 ax2 = axes[1]
-ax2.plot(avg_conductivity, depth, 'gray', linewidth=0.5, alpha=0.5, label='Raw')
-ax2.plot(smoothed, depth, 'black', linewidth=1.5, label='Smoothed')
+ax2.plot(avg_conductivity, depth, 'gray', linewidth=0.5, alpha=0.5, label='Raw', rasterized=True)
+ax2.plot(smoothed, depth, 'black', linewidth=1.5, label='Smoothed', rasterized=True)
 ax2.axvline(CONDUCTIVITY_CUTOFF, color='red', linestyle='--', linewidth=2, 
            label=f'Coal threshold ({CONDUCTIVITY_CUTOFF})')
 
 # Shade coal zones
-for _, seam in coal_seams_df.iterrows():
-    ax2.axhspan(seam['Top_m'], seam['Base_m'], 
-                color='brown', alpha=0.3)
+depth_spans(ax2, seam_tops, seam_bases, color='brown', alpha=0.3)
 
 ax2.set_xlabel('Avg Conductivity', fontsize=10)
 ax2.set_ylabel('Depth (m)', fontsize=10)
@@ -194,7 +215,7 @@ ax2.legend(fontsize=8)
 # Track 3: Coal flag and cumulative thickness
 ax3 = axes[2]
 coal_flag = coal_mask.astype(float)
-ax3.fill_betweenx(depth, 0, coal_flag, color='brown', alpha=0.5, step='mid')
+ax3.fill_betweenx(depth, 0, coal_flag, color='brown', alpha=0.5, step='mid', rasterized=True)
 ax3.set_xlim(-0.1, 1.1)
 ax3.set_xlabel('Coal Flag', fontsize=10)
 ax3.set_ylabel('Depth (m)', fontsize=10)
@@ -205,21 +226,23 @@ ax3.set_xticks([0, 1])
 ax3.set_xticklabels(['Shale', 'Coal'])
 
 # Add thickness annotations
-for _, seam in coal_seams_df.iterrows():
-    mid_depth = (seam['Top_m'] + seam['Base_m']) / 2
-    ax3.text(0.5, mid_depth, f"{seam['Thickness_m']:.2f}m", 
+for mid_depth, seam_label in zip(seam_mids, seam_labels):
+    ax3.text(0.5, mid_depth, seam_label,
              fontsize=8, ha='center', va='center', fontweight='bold',
              bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
 
 plt.tight_layout()
 
-# Save figure
+# Save figure (image and per-sample curves are rasterized, so the PDF embeds
+# bitmaps at 150 dpi instead of ~10^5-vertex paths)
 output_png = 'Coal_Seams_Detected.png'
-output_pdf = 'Coal_Seams_Detected.pdf'
 plt.savefig(output_png, dpi=300, bbox_inches='tight')
-plt.savefig(output_pdf, bbox_inches='tight')
 print(f"✓ Figure saved: {output_png}")
-print(f"✓ Figure saved: {output_pdf}")
+if not args.no_pdf:
+    output_pdf = 'Coal_Seams_Detected.pdf'
+    plt.savefig(output_pdf, dpi=150, bbox_inches='tight')
+    print(f"✓ Figure saved: {output_pdf}")
+plt.close(fig)
 
 print("\n" + "="*80)
 print("COAL SEAM DETECTION COMPLETE")
@@ -227,8 +250,8 @@ print("="*80)
 print(f"\nSummary:")
 print(f"  • Total coal seams detected: {len(coal_seams_df)}")
 print(f"  • Total coal thickness: {total_thickness:.2f}m")
-print(f"  • Net-to-Gross ratio: {total_thickness/(depth.max()-depth.min())*100:.1f}%")
+print(f"  • Net-to-Gross ratio: {total_thickness/zone_thickness*100:.1f}%")
 print(f"  • Average seam thickness: {total_thickness/len(coal_seams_df):.3f}m")
-print(f"  • Thickest seam: {coal_seams_df['Thickness_m'].max():.3f}m")
-print(f"  • Thinnest seam: {coal_seams_df['Thickness_m'].min():.3f}m")
+print(f"  • Thickest seam: {thickness_stats['max']:.3f}m")
+print(f"  • Thinnest seam: {thickness_stats['min']:.3f}m")
 print("="*80 + "\n")
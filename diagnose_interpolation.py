@@ -57,19 +57,10 @@ with dlis.load(dlis_file) as files:
         pad_offset = pad_offsets[1]
         num_buttons = bt1l_test.shape[1]
         
-        # Calculate azimuth positions for each button
-        button_azimuths = []
-        for btn in range(num_buttons):
-            if num_buttons > 1:
-                btn_offset = -button_span/2 + (btn / (num_buttons-1)) * button_span
-            else:
-                btn_offset = 0
-            
-            # Azimuth at each depth
-            btn_az = (test_p1az + pad_offset + btn_offset) % 360
-            button_azimuths.append(btn_az)
-        
-        button_azimuths = np.array(button_azimuths)
+        # Calculate azimuth positions for each button (buttons evenly across the span),
+        # as a (button, depth) array
+        btn_offsets = np.linspace(-button_span/2, button_span/2, num_buttons) if num_buttons > 1 else np.zeros(1)
+        button_azimuths = (test_p1az[np.newaxis, :] + pad_offset + btn_offsets[:, np.newaxis]) % 360
         
         print(f"\nButton azimuth spread for Pad 1:")
         print(f"  Button span: {button_span}°")
@@ -109,22 +100,17 @@ with dlis.load(dlis_file) as files:
             pad_offset = pad_offsets[pad_num]
             num_btns = btn_data.shape[1]
             
-            for btn in range(num_btns):
-                if num_btns > 1:
-                    btn_offset = -button_span/2 + (btn / (num_btns-1)) * button_span
-                else:
-                    btn_offset = 0
-                
-                btn_az = (test_p1az[depth_idx] + pad_offset + btn_offset) % 360
-                btn_val = btn_data[depth_idx, btn]
-                
-                all_pad_data.append(btn_val)
-                all_pad_az.append(btn_az)
+            # Whole pad row at once: every button's azimuth and value at this depth
+            btn_offsets = np.linspace(-button_span/2, button_span/2, num_btns) if num_btns > 1 else np.zeros(1)
+            all_pad_az.append((test_p1az[depth_idx] + pad_offset + btn_offsets) % 360)
+            all_pad_data.append(btn_data[depth_idx])
         
         # Sort by azimuth
+        all_pad_az = np.concatenate(all_pad_az)
+        all_pad_data = np.concatenate(all_pad_data)
         sorted_idx = np.argsort(all_pad_az)
-        all_pad_az = np.array(all_pad_az)[sorted_idx]
-        all_pad_data = np.array(all_pad_data)[sorted_idx]
+        all_pad_az = all_pad_az[sorted_idx]
+        all_pad_data = all_pad_data[sorted_idx]
         
         axes[0, 0].plot(all_pad_az, all_pad_data, 'ro', markersize=6, label='Button measurements')
         
@@ -142,9 +128,7 @@ with dlis.load(dlis_file) as files:
         axes[0, 0].set_xlim(0, 360)
         
         # Panel 2: Show button coverage pattern
-        coverage_map = np.zeros(360)
-        for az in all_pad_az:
-            coverage_map[int(az) % 360] += 1
+        coverage_map = np.bincount(all_pad_az.astype(int) % 360, minlength=360)
         
         axes[0, 1].bar(range(360), coverage_map, width=1, color='green', alpha=0.6)
         axes[0, 1].set_xlabel('Azimuth (degrees)', fontweight='bold')
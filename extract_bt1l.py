@@ -6,8 +6,8 @@ Focus on button array structure and data
 
 from dlisio import dlis
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
+from cmi_io import zone_rows
 
 print("\n" + "="*80)
 print("EXTRACTING BT1L CHANNEL")
@@ -114,9 +114,10 @@ with dlis.load(dlis_file) as files:
             print(f"Button values: {bt1l_data[1000]}")
             
             # Check zone of interest (Upper Juandah to Eurombah: 233.3-547.0m)
-            zone_mask = (depth >= 233.3) & (depth <= 547.0)
-            zone_depth = depth[zone_mask]
-            zone_data = bt1l_data[zone_mask]
+            # (depth is monotonic, so the zone is a row slice: views, not boolean-mask copies)
+            rows = zone_rows(depth, 233.3, 547.0)
+            zone_depth = depth[rows]
+            zone_data = bt1l_data[rows]
             
             print(f"\n{'='*80}")
             print(f"ZONE OF INTEREST (233.3-547.0m)")
@@ -131,39 +132,37 @@ with dlis.load(dlis_file) as files:
             print(f"{'='*80}")
             
             # Reshape the data - it's (samples, 1, 10) so squeeze out middle dimension
-            zone_data_2d = zone_data.squeeze()  # Convert from (N, 1, 10) to (N, 10)
+            # The float32 cast is the one copy of the zone (shared by the CSV and plots)
+            zone_data_2d = zone_data.squeeze().astype(np.float32)  # Convert from (N, 1, 10) to (N, 10)
             
-            # Replace null values (-9999) with NaN
-            zone_data_2d[zone_data_2d == -9999] = np.nan
+            # Replace null values in place (-9999 and any other negative reading, as in cmi_io)
+            np.putmask(zone_data_2d, zone_data_2d < 0, np.nan)
             
-            # Create DataFrame with button columns
-            df_dict = {'DEPTH': zone_depth}
+            # Button columns (a single column when there is one value per depth)
+            num_buttons = zone_data_2d.shape[1] if len(zone_data_2d.shape) == 2 else 1
+            columns = ['DEPTH'] + [f'BUTTON_{btn+1}' for btn in range(num_buttons)]
             
-            # Handle different array shapes
-            if len(zone_data_2d.shape) == 2:
-                num_buttons = zone_data_2d.shape[1]
-                for btn in range(num_buttons):
-                    df_dict[f'BUTTON_{btn+1}'] = zone_data_2d[:, btn]
-            else:
-                # Single column
-                df_dict['BUTTON_1'] = zone_data_2d
-            
-            df = pd.DataFrame(df_dict)
-            
-            # Save to CSV
+            # Save to CSV, streaming rows in chunks through the C-level writer instead of
+            # formatting every cell through a DataFrame (NaN is written as "nan")
             output_file = 'BT1L_Button_Data.csv'
-            df.to_csv(output_file, index=False, float_format='%.6f')
+            chunk_rows = 8192
+            with open(output_file, 'w') as csv_out:
+                csv_out.write(','.join(columns) + '\n')
+                for start in range(0, len(zone_depth), chunk_rows):
+                    stop = start + chunk_rows
+                    np.savetxt(csv_out, np.column_stack([zone_depth[start:stop], zone_data_2d[start:stop]]),
+                               fmt='%.6f', delimiter=',')
             print(f"✓ Saved to: {output_file}")
-            print(f"  Columns: {list(df.columns)}")
-            print(f"  Rows: {len(df)}")
+            print(f"  Columns: {columns}")
+            print(f"  Rows: {len(zone_depth)}")
             
             # Create a quick visualization
             print(f"\n{'='*80}")
             print(f"CREATING VISUALIZATION")
             print(f"{'='*80}")
             
-            # Use the cleaned 2D data
-            plot_data = zone_data_2d.copy()
+            # Use the cleaned 2D data (not modified below, so no copy)
+            plot_data = zone_data_2d
             
             fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 10))
             
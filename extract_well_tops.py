@@ -2,26 +2,32 @@
 Script to extract well tops table from a well completion report PDF.
 """
 
-import PyPDF2
+import pypdfium2 as pdfium
 import pandas as pd
 import re
 from pathlib import Path
 
 def extract_text_from_pdf(pdf_path):
-    """Extract all text from PDF file."""
+    """Extract all text from PDF file (pdfium text layer, also used by pdfplumber)."""
     text_by_page = []
-    with open(pdf_path, 'rb') as file:
-        pdf_reader = PyPDF2.PdfReader(file)
-        num_pages = len(pdf_reader.pages)
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        num_pages = len(pdf)
         print(f"Total pages in PDF: {num_pages}")
         
         for page_num in range(num_pages):
-            page = pdf_reader.pages[page_num]
-            text = page.extract_text()
+            page = pdf[page_num]
+            textpage = page.get_textpage()
+            # pdfium breaks lines with \r\n; keep PyPDF2's \n so the text matches as before
+            text = textpage.get_text_range().replace('\r\n', '\n')
+            textpage.close()
+            page.close()
             text_by_page.append({
                 'page': page_num + 1,
                 'text': text
             })
+    finally:
+        pdf.close()
     
     return text_by_page
 
@@ -8,78 +8,78 @@ import pandas as pd
 from pathlib import Path
 import re
 
-def extract_tables_from_pdf(pdf_path):
-    """Extract all tables from PDF using pdfplumber."""
+# Depth followed by a formation name, compiled once; the name is bounded to 40 characters so a
+# long run of letters and whitespace cannot make the backtracking search quadratic
+DEPTH_RE = re.compile(r'(\d{2,4}(?:\.\d{1,2})?)\s*m?\s*(md|tvd|mdrt|tvdrt)?\s*[:\-]?\s*'
+                      r'([A-Z][a-zA-Z\s]{1,40}(?:Formation|Sandstone|Coal|Measures))', re.IGNORECASE)
+
+def read_pdf_pages(pdf_path):
+    """Extract (page number, text, tables) for every page in one pass over the PDF."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [(i + 1, page.extract_text(), page.extract_tables())
+                for i, page in enumerate(pdf.pages)]
+
+def extract_tables_from_pdf(pages):
+    """Collect tables that look like well tops from the extracted pages."""
     all_tables = []
     
-    with pdfplumber.open(pdf_path) as pdf:
-        print(f"Total pages: {len(pdf.pages)}\n")
-        
-        for i, page in enumerate(pdf.pages):
-            page_num = i + 1
-            
-            # Extract tables from this page
-            tables = page.extract_tables()
-            
-            if tables:
-                print(f"Page {page_num}: Found {len(tables)} table(s)")
-                for j, table in enumerate(tables):
-                    if table and len(table) > 0:
-                        # Check if this might be a well tops table
-                        table_text = str(table).lower()
-                        if any(keyword in table_text for keyword in ['formation', 'depth', 'top', 'md', 'tvd']):
-                            print(f"  Table {j+1} (potential well tops table):")
-                            # Show first few rows
-                            for row in table[:min(5, len(table))]:
-                                print(f"    {row}")
-                            
-                            all_tables.append({
-                                'page': page_num,
-                                'table_num': j + 1,
-                                'data': table
-                            })
+    print(f"Total pages: {len(pages)}\n")
+    
+    for page_num, _, tables in pages:
+        if tables:
+            print(f"Page {page_num}: Found {len(tables)} table(s)")
+            for j, table in enumerate(tables):
+                if table and len(table) > 0:
+                    # Check if this might be a well tops table
+                    table_text = str(table).lower()
+                    if any(keyword in table_text for keyword in ['formation', 'depth', 'top', 'md', 'tvd']):
+                        print(f"  Table {j+1} (potential well tops table):")
+                        # Show first few rows
+                        for row in table[:min(5, len(table))]:
+                            print(f"    {row}")
+                        
+                        all_tables.append({
+                            'page': page_num,
+                            'table_num': j + 1,
+                            'data': table
+                        })
     
     return all_tables
 
-def search_for_well_tops_text(pdf_path):
-    """Search for well tops information in text."""
+def search_for_well_tops_text(pages):
+    """Search for well tops information in the extracted page text."""
     formations_found = []
     
-    with pdfplumber.open(pdf_path) as pdf:
-        for i, page in enumerate(pdf.pages):
-            page_num = i + 1
-            text = page.extract_text()
-            
-            if text:
-                text_lower = text.lower()
-                # Look for well tops section
-                if 'well tops' in text_lower or 'stratigraphic tops' in text_lower or 'formation tops' in text_lower:
-                    print(f"\n{'='*80}")
-                    print(f"PAGE {page_num} - Potential Well Tops Section")
-                    print('='*80)
-                    
-                    # Extract the relevant section
-                    lines = text.split('\n')
-                    for idx, line in enumerate(lines):
-                        if 'top' in line.lower() or 'formation' in line.lower():
-                            # Print context (5 lines before and after)
-                            start = max(0, idx - 5)
-                            end = min(len(lines), idx + 10)
-                            print('\n'.join(lines[start:end]))
-                            print('-' * 40)
-                            break
-                
-                # Look for depth patterns with formation names
-                depth_pattern = r'(\d{2,4}(?:\.\d{1,2})?)\s*m?\s*(md|tvd|mdrt|tvdrt)?\s*[:\-]?\s*([A-Z][a-zA-Z\s]+(?:Formation|Sandstone|Coal|Measures))'
-                matches = re.finditer(depth_pattern, text, re.IGNORECASE)
+    for page_num, text, _ in pages:
+        if text:
+            text_lower = text.lower()
+            # Look for well tops section
+            if 'well tops' in text_lower or 'stratigraphic tops' in text_lower or 'formation tops' in text_lower:
+                print(f"\n{'='*80}")
+                print(f"PAGE {page_num} - Potential Well Tops Section")
+                print('='*80)
                 
-                for match in matches:
-                    formations_found.append({
-                        'page': page_num,
-                        'depth': match.group(1),
-                        'depth_type': match.group(2) or 'MD',
-                        'formation': match.group(3).strip()
-                    })
+                # Extract the relevant section
+                lines = text.split('\n')
+                for idx, line in enumerate(lines):
+                    if 'top' in line.lower() or 'formation' in line.lower():
+                        # Print context (5 lines before and after)
+                        start = max(0, idx - 5)
+                        end = min(len(lines), idx + 10)
+                        print('\n'.join(lines[start:end]))
+                        print('-' * 40)
+                        break
+            
+            # Look for depth patterns with formation names
+            matches = DEPTH_RE.finditer(text)
+            
+            for match in matches:
+                formations_found.append({
+                    'page': page_num,
+                    'depth': match.group(1),
+                    'depth_type': match.group(2) or 'MD',
+                    'formation': match.group(3).strip()
+                })
     
     return formations_found
 
@@ -94,15 +94,18 @@ def main():
     print("EXTRACTING TABLES FROM PDF")
     print("="*80)
     
+    # Parse the PDF once; both searches below reuse the extracted pages
+    pages = read_pdf_pages(pdf_path)
+    
     # Extract tables
-    tables = extract_tables_from_pdf(pdf_path)
+    tables = extract_tables_from_pdf(pages)
     
     print("\n" + "="*80)
     print("SEARCHING FOR WELL TOPS IN TEXT")
     print("="*80)
     
     # Search for well tops in text
-    formations = search_for_well_tops_text(pdf_path)
+    formations = search_for_well_tops_text(pages)
     
     if formations:
         print(f"\n\nFound {len(formations)} potential formation tops:")
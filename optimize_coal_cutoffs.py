@@ -10,23 +10,24 @@ import matplotlib.pyplot as plt
 from matplotlib.colors import LogNorm
 from scipy.ndimage import gaussian_filter1d
 from scipy.stats import gaussian_kde
-import lasio
+from cmi_io import load_cmi_image, load_las_curves
 
 print("\n" + "="*80)
 print("COAL CUTOFF OPTIMIZATION - CMI CONDUCTIVITY vs DENSITY")
 print("="*80)
 
+MAX_SCATTER_POINTS = 50000  # cross-plot markers; more are indistinguishable at s=0.5, alpha=0.3
+
 # Load CMI data
 print("\nLoading processed CMI image...")
-cmi_data = pd.read_csv('CMI_NoInterpolation_Image.csv')
-depth_cmi = cmi_data['DEPTH'].values
-image = cmi_data.iloc[:, 1:].values
-avg_conductivity = np.nanmean(image, axis=1)
+cmi = load_cmi_image()  # binary sidecar; the CSV is only parsed if it is missing or stale
+depth_cmi = cmi.depth
+avg_conductivity = cmi.avg_conductivity
 print(f"✓ CMI data loaded: {len(depth_cmi)} samples")
 
 # Load density log from LAS
 print("\nLoading density log...")
-las = lasio.read('Raw dataset/qgc_anya_105_mai_mfe_mss_mpd_mdn_hires.las')
+las = load_las_curves()  # cached .npy curves; the LAS text is only parsed if they are missing or stale
 depth_las = las['DEPT']
 rhob = las['HDEN']  # High-resolution bulk density
 
@@ -74,26 +75,31 @@ print("-"*80)
 # Siderite: Low conductivity BUT higher density (>2.5 g/cc)
 print("\nAnalyzing lithology populations...")
 
-coal_mask = (valid_rhob < 1.8)
-siderite_mask = (valid_rhob > 2.5) & (valid_cond < 200)
-shale_mask = (valid_rhob >= 1.8) & (valid_rhob <= 2.5)
+# One int8 lithology label per sample (0 = dense but conductive, left unclassified);
+# counts come from one bincount and each population's conductivities are gathered once
+COAL, SIDERITE, SHALE = 1, 2, 3
+lithology = np.select([valid_rhob < 1.8, valid_rhob <= 2.5, valid_cond < 200],
+                      [COAL, SHALE, SIDERITE], 0).astype(np.int8)
+lithology_counts = np.bincount(lithology, minlength=4)
+coal_cond = valid_cond[lithology == COAL]
+siderite_cond = valid_cond[lithology == SIDERITE]
+shale_cond = valid_cond[lithology == SHALE]
 
 print(f"\nPreliminary classification:")
-print(f"  Coal (RHOB < 1.8):      {np.sum(coal_mask):6d} samples ({np.sum(coal_mask)/len(valid_rhob)*100:5.1f}%)")
-print(f"  Siderite (RHOB > 2.5):  {np.sum(siderite_mask):6d} samples ({np.sum(siderite_mask)/len(valid_rhob)*100:5.1f}%)")
-print(f"  Shale (1.8-2.5):        {np.sum(shale_mask):6d} samples ({np.sum(shale_mask)/len(valid_rhob)*100:5.1f}%)")
+print(f"  Coal (RHOB < 1.8):      {lithology_counts[COAL]:6d} samples ({lithology_counts[COAL]/len(valid_rhob)*100:5.1f}%)")
+print(f"  Siderite (RHOB > 2.5):  {lithology_counts[SIDERITE]:6d} samples ({lithology_counts[SIDERITE]/len(valid_rhob)*100:5.1f}%)")
+print(f"  Shale (1.8-2.5):        {lithology_counts[SHALE]:6d} samples ({lithology_counts[SHALE]/len(valid_rhob)*100:5.1f}%)")
 
 # Conductivity statistics for each lithology
 print(f"\nConductivity by lithology:")
-print(f"  Coal:     Mean={np.mean(valid_cond[coal_mask]):.1f}, Median={np.median(valid_cond[coal_mask]):.1f}, Std={np.std(valid_cond[coal_mask]):.1f}")
-print(f"  Siderite: Mean={np.mean(valid_cond[siderite_mask]):.1f}, Median={np.median(valid_cond[siderite_mask]):.1f}, Std={np.std(valid_cond[siderite_mask]):.1f}")
-print(f"  Shale:    Mean={np.mean(valid_cond[shale_mask]):.1f}, Median={np.median(valid_cond[shale_mask]):.1f}, Std={np.std(valid_cond[shale_mask]):.1f}")
+print(f"  Coal:     Mean={np.mean(coal_cond):.1f}, Median={np.median(coal_cond):.1f}, Std={np.std(coal_cond):.1f}")
+print(f"  Siderite: Mean={np.mean(siderite_cond):.1f}, Median={np.median(siderite_cond):.1f}, Std={np.std(siderite_cond):.1f}")
+print(f"  Shale:    Mean={np.mean(shale_cond):.1f}, Median={np.median(shale_cond):.1f}, Std={np.std(shale_cond):.1f}")
 
 # Calculate optimal conductivity cutoff for coal
 # Use P75 of coal population or P25 of shale population, whichever is lower
-coal_cond_p75 = np.percentile(valid_cond[coal_mask], 75)
-coal_cond_p90 = np.percentile(valid_cond[coal_mask], 90)
-shale_cond_p25 = np.percentile(valid_cond[shale_mask], 25)
+coal_cond_p75, coal_cond_p90 = np.percentile(coal_cond, [75, 90])
+shale_cond_p25 = np.percentile(shale_cond, 25)
 
 print(f"\nConductivity cutoff candidates:")
 print(f"  Coal P75:  {coal_cond_p75:.1f}")
@@ -109,8 +115,11 @@ fig = plt.figure(figsize=(18, 12))
 gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
 
 # 1. Cross-plot with density coloring
+# (a fixed random subset of the samples; the hist2d panel shows the full density)
 ax1 = fig.add_subplot(gs[0, 0])
-scatter = ax1.scatter(valid_cond, valid_rhob, c=valid_rhob, s=0.5, alpha=0.3, 
+rng = np.random.default_rng(0)
+scatter_idx = np.sort(rng.choice(len(valid_cond), size=min(MAX_SCATTER_POINTS, len(valid_cond)), replace=False))
+scatter = ax1.scatter(valid_cond[scatter_idx], valid_rhob[scatter_idx], c=valid_rhob[scatter_idx], s=0.5, alpha=0.3, 
                      cmap='viridis', vmin=1.0, vmax=3.0)
 ax1.axhline(1.8, color='red', linestyle='--', linewidth=2, label='Coal density cutoff (1.8)')
 ax1.axvline(recommended_cutoff, color='orange', linestyle='--', linewidth=2, 
@@ -138,9 +147,9 @@ plt.colorbar(h[3], ax=ax2, label='Count (log)')
 
 # 3. Conductivity histogram by lithology
 ax3 = fig.add_subplot(gs[0, 2])
-ax3.hist(valid_cond[coal_mask], bins=50, alpha=0.5, color='brown', label='Coal (RHOB<1.8)', density=True)
-ax3.hist(valid_cond[siderite_mask], bins=50, alpha=0.5, color='orange', label='Siderite (RHOB>2.5)', density=True)
-ax3.hist(valid_cond[shale_mask], bins=50, alpha=0.5, color='gray', label='Shale (1.8-2.5)', density=True)
+ax3.hist(coal_cond, bins=50, alpha=0.5, color='brown', label='Coal (RHOB<1.8)', density=True)
+ax3.hist(siderite_cond, bins=50, alpha=0.5, color='orange', label='Siderite (RHOB>2.5)', density=True)
+ax3.hist(shale_cond, bins=50, alpha=0.5, color='gray', label='Shale (1.8-2.5)', density=True)
 ax3.axvline(recommended_cutoff, color='red', linestyle='--', linewidth=2, label=f'Cutoff ({recommended_cutoff:.0f})')
 ax3.axvline(170, color='blue', linestyle=':', linewidth=1.5, label='User (170)')
 ax3.set_xlabel('CMI Conductivity', fontsize=10)
@@ -230,9 +239,9 @@ cutoffs = {
     'Coal_Cond_P90': coal_cond_p90,
     'Shale_Cond_P25': shale_cond_p25,
     'User_Suggested_Cond': 170,
-    'Coal_Samples': int(np.sum(coal_mask)),
-    'Siderite_Samples': int(np.sum(siderite_mask)),
-    'Shale_Samples': int(np.sum(shale_mask))
+    'Coal_Samples': int(lithology_counts[COAL]),
+    'Siderite_Samples': int(lithology_counts[SIDERITE]),
+    'Shale_Samples': int(lithology_counts[SHALE])
 }
 
 cutoffs_df = pd.DataFrame([cutoffs])
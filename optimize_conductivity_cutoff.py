@@ -7,31 +7,31 @@ Uses multiple statistical methods to find optimal threshold
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from scipy.ndimage import gaussian_filter1d
 from scipy.stats import gaussian_kde
 from scipy.signal import find_peaks
 from sklearn.mixture import GaussianMixture
-import lasio
+from cmi_io import load_cmi_image, load_las_curves, gaussian_smooth
 
 print("\n" + "="*80)
 print("CONDUCTIVITY CUTOFF OPTIMIZATION FOR COAL DETECTION")
 print("="*80)
 
+MAX_SCATTER_POINTS = 50000  # cross-plot markers; more are indistinguishable at s=0.5, alpha=0.3
+
 # Load CMI data
 print("\nLoading processed CMI image...")
-cmi_data = pd.read_csv('CMI_NoInterpolation_Image.csv')
-depth_cmi = cmi_data['DEPTH'].values
-image = cmi_data.iloc[:, 1:].values
-avg_conductivity = np.nanmean(image, axis=1)
+cmi = load_cmi_image()  # binary sidecar; the CSV is only parsed if it is missing or stale
+depth_cmi = cmi.depth
+avg_conductivity = cmi.avg_conductivity
 print(f"✓ CMI data loaded: {len(depth_cmi)} samples")
 
-# Smooth conductivity
+# Smooth conductivity exactly as detect_coal_seams.py does
 window_samples = int(0.05 / np.median(np.diff(depth_cmi)))  # 5cm window
-smoothed_cond = gaussian_filter1d(avg_conductivity, sigma=window_samples)
+smoothed_cond = gaussian_smooth(avg_conductivity, window_samples)
 
 # Load density log
 print("\nLoading density log...")
-las = lasio.read('Raw dataset/qgc_anya_105_mai_mfe_mss_mpd_mdn_hires.las')
+las = load_las_curves()  # cached .npy curves; the LAS text is only parsed if they are missing or stale
 depth_las = las['DEPT']
 rhob = las['HDEN']
 rhob_resampled = np.interp(depth_cmi, depth_las, rhob)
@@ -152,7 +152,8 @@ smooth_hist = gaussian_filter1d(hist.astype(float), sigma=2)
 derivative = np.gradient(smooth_hist)
 
 # Find peaks in derivative (rapid changes in distribution)
-peaks, _ = find_peaks(np.abs(derivative), prominence=np.max(np.abs(derivative))*0.1)
+abs_derivative = np.abs(derivative)
+peaks, _ = find_peaks(abs_derivative, prominence=abs_derivative.max()*0.1)
 
 if len(peaks) > 0:
     # Use first major peak as cutoff
@@ -278,8 +279,11 @@ ax4.grid(True, alpha=0.3)
 ax4.legend(fontsize=8)
 
 # 5. Cross-plot: Conductivity vs Density
+# (a fixed random subset of the samples; the histograms show the full distribution)
 ax5 = axes[1, 1]
-scatter = ax5.scatter(smoothed_cond, rhob_resampled, c=rhob_resampled, s=0.5, alpha=0.3,
+rng = np.random.default_rng(0)
+scatter_idx = np.sort(rng.choice(len(smoothed_cond), size=min(MAX_SCATTER_POINTS, len(smoothed_cond)), replace=False))
+scatter = ax5.scatter(smoothed_cond[scatter_idx], rhob_resampled[scatter_idx], c=rhob_resampled[scatter_idx], s=0.5, alpha=0.3,
                      cmap='viridis', vmin=1.0, vmax=3.0)
 ax5.axvline(recommended, color='black', linestyle='-', linewidth=3, label=f'Recommended ({recommended:.0f})')
 ax5.axvline(170, color='cyan', linestyle=':', linewidth=2, label='User (170)')
@@ -84,7 +84,7 @@ with dlis.load(dlis_file) as files:
         ax1 = plt.subplot(1, 3, 1)
         
         extent = [0, 360, zone_depth.max(), zone_depth.min()]
-        im1 = ax1.imshow(zone_dyn, aspect='auto', extent=extent,
+        im1 = ax1.imshow(zone_dyn, aspect='auto', rasterized=True, extent=extent,
                         cmap=coal_cmap, interpolation='bilinear',
                         vmin=0, vmax=255)
         
@@ -101,7 +101,7 @@ with dlis.load(dlis_file) as files:
         # Panel 2: CMI_STAT (Static Image)
         ax2 = plt.subplot(1, 3, 2)
         
-        im2 = ax2.imshow(zone_stat, aspect='auto', extent=extent,
+        im2 = ax2.imshow(zone_stat, aspect='auto', rasterized=True, extent=extent,
                         cmap=coal_cmap, interpolation='bilinear',
                         vmin=0, vmax=255)
         
@@ -126,7 +126,7 @@ with dlis.load(dlis_file) as files:
         zoom_stat = zone_stat[zoom_mask]
         
         extent_zoom = [0, 360, zoom_depth.max(), zoom_depth.min()]
-        im3 = ax3.imshow(zoom_stat, aspect='auto', extent=extent_zoom,
+        im3 = ax3.imshow(zoom_stat, aspect='auto', rasterized=True, extent=extent_zoom,
                         cmap=coal_cmap, interpolation='bilinear',
                         vmin=0, vmax=255)
         
@@ -151,7 +151,7 @@ with dlis.load(dlis_file) as files:
         print(f"✓ Saved image to: {output_png}")
         
         output_pdf = 'CMI_Processed_Images.pdf'
-        plt.savefig(output_pdf, bbox_inches='tight')
+        plt.savefig(output_pdf, dpi=150, bbox_inches='tight')
         print(f"✓ Saved image to: {output_pdf}")
 
         print("\n" + "="*80)
@@ -8,9 +8,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from matplotlib.gridspec import GridSpec
+from cmi_io import depth_lines
 import warnings
 warnings.filterwarnings('ignore')
 
+
 print("="*80)
 print("CREATING LOG DISPLAY")
 print("="*80)
@@ -25,6 +27,7 @@ base_depth = tops[tops['Formation'] == 'Eurombah Formation']['Depth_MDRT_m'].val
 
 # Filter tops within zone
 zone_tops = tops[(tops['Depth_MDRT_m'] >= top_depth) & (tops['Depth_MDRT_m'] <= base_depth)]
+zone_top_depths = zone_tops['Depth_MDRT_m'].to_numpy()
 
 print(f"Creating log plot from {top_depth:.1f}m to {base_depth:.1f}m...")
 
@@ -47,14 +50,14 @@ ax1.yaxis.set_label_position('left')
 ax1.yaxis.tick_left()
 ax1.grid(True, alpha=0.3)
 
-# Add formation labels
+# Add formation lines (one artist) and labels
+depth_lines(ax1, zone_top_depths, color='black', linewidth=2, linestyle='-')
 for idx, row in zone_tops.iterrows():
     depth = row['Depth_MDRT_m']
     formation = row['Formation'].replace(' Coal Measures', '\nCoal\nMeas.')
     formation = formation.replace(' Formation', '\nFm.')
     formation = formation.replace(' Sandstone', '\nSst.')
     
-    ax1.axhline(depth, color='black', linewidth=2, linestyle='-')
     ax1.text(0.5, depth - 5, formation, ha='center', va='top', 
              fontsize=7, fontweight='bold', rotation=0)
 
@@ -272,8 +275,7 @@ ax7.tick_params(labelsize=7)
 # Add formation tops lines to all tracks
 # ============================================================================
 for ax in [ax2, ax3, ax4, ax5, ax6, ax7]:
-    for idx, row in zone_tops.iterrows():
-        ax.axhline(row['Depth_MDRT_m'], color='black', linewidth=1.5, linestyle='-', alpha=0.7)
+    depth_lines(ax, zone_top_depths, color='black', linewidth=1.5, linestyle='-', alpha=0.7)
 
 # ============================================================================
 # Add summary text box
@@ -6,11 +6,43 @@ Replicates vendor processing workflow from raw button measurements
 
 from dlisio import dlis
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.colors import LinearSegmentedColormap
 from scipy.interpolate import griddata
 from scipy.ndimage import median_filter
+from cmi_io import downsample_rows, to_masked_uint8
+
+
+def _fill_azimuth_gaps(image, min_valid=3, chunk_rows=2048):
+    """Periodic linear interpolation across NaN gaps in every row with more than min_valid values"""
+    n_rows, n_az = image.shape
+    filled = image.copy()
+    cols = np.arange(n_az)
+    
+    for start in range(0, n_rows, chunk_rows):
+        block = image[start:start + chunk_rows]
+        valid = ~np.isnan(block)
+        rows = np.nonzero(valid.sum(axis=1) > min_valid)[0]
+        if len(rows) == 0:
+            continue
+        block, valid = block[rows], valid[rows]
+        
+        # Nearest valid column at or before / at or after each column; gaps that wrap
+        # past 0° or 360° take the row's last / first valid column shifted by 360
+        prev_col = np.maximum.accumulate(np.where(valid, cols, -1), axis=1)
+        next_col = np.minimum.accumulate(np.where(valid, cols, n_az)[:, ::-1], axis=1)[:, ::-1]
+        last_valid = prev_col[:, -1:]
+        first_valid = next_col[:, :1]
+        prev_col = np.where(prev_col < 0, last_valid - n_az, prev_col)
+        next_col = np.where(next_col >= n_az, first_valid + n_az, next_col)
+        
+        r = np.arange(len(rows))[:, np.newaxis]
+        y0 = block[r, prev_col % n_az]
+        y1 = block[r, next_col % n_az]
+        span = np.maximum(next_col - prev_col, 1)
+        filled[start + rows] = np.where(valid, block, y0 + (y1 - y0) * (cols - prev_col) / span)
+    return filled
+
 
 print("\n" + "="*80)
 print("PROCESSING CMI BUTTON DATA TO BOREHOLE IMAGE")
@@ -19,6 +51,7 @@ print("="*80)
 # Zone of interest
 TOP_DEPTH = 233.3
 BASE_DEPTH = 547.0
+MAX_DISPLAY_ROWS = 6000  # 20 in figure height × 300 dpi
 
 print(f"\nZone of Interest: {TOP_DEPTH}m to {BASE_DEPTH}m")
 
@@ -156,7 +189,8 @@ with dlis.load(dlis_file) as files:
         # Create output image: depth × azimuth
         n_depths = len(zone_depth)
         n_azimuth_bins = 360  # 1° bins
-        unwrapped_image = np.full((n_depths, n_azimuth_bins), np.nan)
+        unwrapped_image = np.full((n_depths, n_azimuth_bins), np.nan, dtype=np.float32)
+        depth_rows = np.arange(n_depths)
         
         # For each button, calculate its azimuthal position and map to image
         for btn_idx, (btn_data, info) in enumerate(zip(normalized_buttons, button_info)):
@@ -186,11 +220,10 @@ with dlis.load(dlis_file) as files:
                 # Map to azimuth bins
                 azimuth_bins = (button_azimuth).astype(int) % 360
                 
-                # Place button values in the image
-                for depth_idx in range(n_depths):
-                    az_bin = azimuth_bins[depth_idx]
-                    if not np.isnan(btn_data[depth_idx, btn]):
-                        unwrapped_image[depth_idx, az_bin] = btn_data[depth_idx, btn]
+                # Place button values in the image (one bin per depth, so a single scatter)
+                btn_values = btn_data[:, btn]
+                valid = ~np.isnan(btn_values)
+                unwrapped_image[depth_rows[valid], azimuth_bins[valid]] = btn_values[valid]
         
         # Count coverage
         coverage = 100 * np.sum(~np.isnan(unwrapped_image)) / unwrapped_image.size
@@ -203,23 +236,9 @@ with dlis.load(dlis_file) as files:
         # Interpolate to fill gaps between buttons
         print("Interpolating gaps in azimuthal coverage...")
         
-        filled_image = np.copy(unwrapped_image)
-        
-        # For each depth level, interpolate across azimuth
-        for depth_idx in range(n_depths):
-            row = unwrapped_image[depth_idx, :]
-            valid_mask = ~np.isnan(row)
-            
-            if np.sum(valid_mask) > 3:  # Need at least 3 points
-                valid_azimuth = np.where(valid_mask)[0]
-                valid_values = row[valid_mask]
-                
-                # Interpolate (linear) to fill gaps
-                all_azimuth = np.arange(n_azimuth_bins)
-                interpolated = np.interp(all_azimuth, valid_azimuth, valid_values, 
-                                        period=360)  # Periodic boundary
-                
-                filled_image[depth_idx, :] = interpolated
+        # Linear, periodic across 360°, on every depth level with more than 3 buttons
+        filled_image = _fill_azimuth_gaps(unwrapped_image, min_valid=3)
+        del unwrapped_image
         
         coverage_after = 100 * np.sum(~np.isnan(filled_image)) / filled_image.size
         print(f"✓ Coverage after interpolation: {coverage_after:.1f}%")
@@ -232,6 +251,7 @@ with dlis.load(dlis_file) as files:
         print("Applying median filter to reduce noise...")
         # Use smaller filter to preserve resolution
         smoothed_image = median_filter(filled_image, size=(1, 3))  # Only smooth azimuthally, not vertically
+        del filled_image
         print(f"  Filter size: 1×3 (preserves vertical resolution)")
         
         print("\n" + "="*80)
@@ -240,17 +260,20 @@ with dlis.load(dlis_file) as files:
         
         # Normalize to 0-255 range for standard image display
         # Use percentile clipping to handle outliers
-        p05 = np.nanpercentile(smoothed_image, 5)
-        p95 = np.nanpercentile(smoothed_image, 95)
+        # (min and max come from the same sort as the clip percentiles)
+        data_min, p05, p95, data_max = np.nanpercentile(smoothed_image, [0, 5, 95, 100])
         
-        print(f"Data range: {np.nanmin(smoothed_image):.1f} to {np.nanmax(smoothed_image):.1f} MMHO")
+        print(f"Data range: {data_min:.1f} to {data_max:.1f} MMHO")
         print(f"Using P05-P95: {p05:.1f} to {p95:.1f} MMHO")
         
-        # Clip and normalize
-        clipped_image = np.clip(smoothed_image, p05, p95)
-        normalized_image = 255 * (clipped_image - p05) / (p95 - p05)
+        # Clip and normalize in place (float32, no further full-size copies)
+        normalized_image = np.clip(smoothed_image, p05, p95, out=smoothed_image)
+        normalized_image -= p05
+        normalized_image *= 255 / (p95 - p05)
         
-        print(f"✓ Normalized to range: {np.nanmin(normalized_image):.1f} to {np.nanmax(normalized_image):.1f}")
+        # Clipping is monotonic, so the normalized range follows from the data range
+        norm_min, norm_max = 255 * (np.clip([data_min, data_max], p05, p95) - p05) / (p95 - p05)
+        print(f"✓ Normalized to range: {norm_min:.1f} to {norm_max:.1f}")
         
         print("\n" + "="*80)
         print("CREATING VISUALIZATION")
@@ -266,8 +289,12 @@ with dlis.load(dlis_file) as files:
         # Panel 1: Our processed image
         ax1 = plt.subplot(1, 3, 1)
         
-        extent = [0, 360, zone_depth.max(), zone_depth.min()]
-        im1 = ax1.imshow(normalized_image, aspect='auto', extent=extent,
+        # Panels show rows block-averaged to the figure's pixel height, the 0-255 ones as
+        # uint8 copies (NaN gaps masked); the CSV keeps full resolution and precision
+        display_image = to_masked_uint8(downsample_rows(normalized_image, MAX_DISPLAY_ROWS))
+        rows_shown = display_image.shape[0] * max(1, n_depths // MAX_DISPLAY_ROWS)
+        extent = [0, 360, zone_depth[rows_shown - 1], zone_depth[0]]
+        im1 = ax1.imshow(display_image, aspect='auto', rasterized=True, extent=extent,
                         cmap=coal_cmap, interpolation='none',  # No interpolation to preserve resolution
                         vmin=0, vmax=255)
         
@@ -287,7 +314,7 @@ with dlis.load(dlis_file) as files:
         cmi_dyn = curves_data['CMI_DYN'][zone_mask]
         cmi_dyn[cmi_dyn == -9999] = np.nan
         
-        im2 = ax2.imshow(cmi_dyn, aspect='auto', extent=extent,
+        im2 = ax2.imshow(to_masked_uint8(downsample_rows(cmi_dyn, MAX_DISPLAY_ROWS)), aspect='auto', rasterized=True, extent=extent,
                         cmap=coal_cmap, interpolation='none',  # No interpolation
                         vmin=0, vmax=255)
         
@@ -306,7 +333,7 @@ with dlis.load(dlis_file) as files:
         
         difference = normalized_image - cmi_dyn
         
-        im3 = ax3.imshow(difference, aspect='auto', extent=extent,
+        im3 = ax3.imshow(downsample_rows(difference, MAX_DISPLAY_ROWS), aspect='auto', rasterized=True, extent=extent,
                         cmap='seismic', interpolation='none',  # No interpolation
                         vmin=-50, vmax=50)
         
@@ -331,18 +358,23 @@ with dlis.load(dlis_file) as files:
         print(f"✓ Saved image to: {output_png}")
         
         output_pdf = 'CMI_Custom_Processing.pdf'
-        plt.savefig(output_pdf, bbox_inches='tight')
+        plt.savefig(output_pdf, dpi=150, bbox_inches='tight')
         print(f"✓ Saved image to: {output_pdf}")
         
         # Save processed data
         print("\nSaving processed image data...")
-        df = pd.DataFrame(normalized_image, 
-                         index=zone_depth,
-                         columns=[f'AZ_{i:03d}' for i in range(n_azimuth_bins)])
-        df.index.name = 'DEPTH'
-        
         csv_file = 'CMI_Custom_Processed_Image.csv'
-        df.to_csv(csv_file)
+        columns = ['DEPTH'] + [f'AZ_{i:03d}' for i in range(n_azimuth_bins)]
+        csv_fmt = ['%.4f'] + ['%.3f'] * n_azimuth_bins
+        chunk_rows = 8192
+        
+        # Stream rows in chunks through the C-level writer instead of building a DataFrame
+        with open(csv_file, 'w') as csv_out:
+            csv_out.write(','.join(columns) + '\n')
+            for start in range(0, n_depths, chunk_rows):
+                stop = start + chunk_rows
+                np.savetxt(csv_out, np.column_stack([zone_depth[start:stop], normalized_image[start:stop]]),
+                           fmt=csv_fmt, delimiter=',')
         print(f"✓ Saved processed data to: {csv_file}")
 
         print("\n" + "="*80)
@@ -9,6 +9,8 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
+from cmi_io import partition_percentiles
+
 
 print("\n" + "="*80)
 print("CMI BUTTON DATA QUALITY CONTROL")
@@ -54,24 +56,33 @@ with dlis.load(dlis_file) as files:
         print("1. DATA AVAILABILITY CHECK")
         print(f"{'='*80}")
         
-        all_buttons = []
         qc_stats = []
         
-        for channel_name in button_channels:
-            channel_data = curves_data[channel_name]
-            zone_data = channel_data[zone_mask].squeeze()
-            
-            # Replace nulls
-            zone_data[zone_data == -9999] = np.nan
-            zone_data[zone_data < 0] = np.nan
+        # Preallocate the (depth, button) image and write each channel into its columns
+        n_rows = len(zone_depth)
+        widths = [curves_data[name][0].size for name in button_channels]
+        starts = np.concatenate([[0], np.cumsum(widths)[:-1]])
+        image_array = np.empty((n_rows, sum(widths)), dtype=np.float32)
+        
+        for channel_name, col, width in zip(button_channels, starts, widths):
+            zone_data = image_array[:, col:col + width]
+            zone_data[:] = curves_data[channel_name][zone_mask].reshape(n_rows, width)
             
-            all_buttons.append(zone_data)
+            # Replace nulls (-9999 and any other negative reading)
+            np.putmask(zone_data, zone_data < 0, np.nan)
             
-            # QC statistics
+            # QC statistics, all from one extraction of the channel's valid values
             total_points = zone_data.size
-            valid_points = np.sum(~np.isnan(zone_data))
-            null_points = np.sum(np.isnan(zone_data))
-            zero_points = np.sum(zone_data == 0)
+            valid_values = zone_data[np.isfinite(zone_data)]
+            valid_points = valid_values.size
+            null_points = total_points - valid_points
+            zero_points = np.count_nonzero(valid_values == 0)
+            if valid_points:
+                chan_min, chan_max = valid_values.min(), valid_values.max()
+                chan_mean = valid_values.mean()
+                chan_std = np.sqrt(np.mean(np.square(valid_values - chan_mean)))
+            else:
+                chan_min = chan_max = chan_mean = chan_std = np.nan
             
             qc_stats.append({
                 'Channel': channel_name,
@@ -80,14 +91,14 @@ with dlis.load(dlis_file) as files:
                 'Null': null_points,
                 'Zero': zero_points,
                 'Valid%': 100 * valid_points / total_points,
-                'Min': np.nanmin(zone_data),
-                'Max': np.nanmax(zone_data),
-                'Mean': np.nanmean(zone_data),
-                'Std': np.nanstd(zone_data)
+                'Min': chan_min,
+                'Max': chan_max,
+                'Mean': chan_mean,
+                'Std': chan_std
             })
             
             print(f"{channel_name}: {valid_points:7d}/{total_points:7d} valid ({100*valid_points/total_points:5.1f}%), "
-                  f"range [{np.nanmin(zone_data):7.1f}, {np.nanmax(zone_data):7.1f}] MMHO")
+                  f"range [{chan_min:7.1f}, {chan_max:7.1f}] MMHO")
         
         qc_df = pd.DataFrame(qc_stats)
         
@@ -116,12 +127,10 @@ with dlis.load(dlis_file) as files:
         print("3. OUTLIER DETECTION")
         print(f"{'='*80}")
         
-        image_array = np.hstack(all_buttons)
-        
         # Global statistics
         global_mean = np.nanmean(image_array)
         global_std = np.nanstd(image_array)
-        global_p99 = np.nanpercentile(image_array, 99)
+        global_p99 = partition_percentiles(image_array, [99])[0]
         
         # Detect extreme outliers (>5 sigma or >10x P99)
         outlier_threshold = min(global_mean + 5*global_std, 10*global_p99)
@@ -14,6 +14,7 @@ Much faster than re-implementing - uses pre-tested, optimized code.
 import os
 import sys
 import subprocess
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
@@ -137,8 +138,9 @@ print("="*80)
 # Load coal seams
 coal_seams = pd.read_csv('Coal_Seams_Detected.csv')
 
-# Calculate statistics
-total_coal = coal_seams['Thickness_m'].sum()
+# Calculate statistics (one aggregation over the seam thicknesses)
+thickness_stats = coal_seams['Thickness_m'].agg(['sum', 'mean', 'max', 'min'])
+total_coal = thickness_stats['sum']
 n_seams = len(coal_seams)
 reservoir_thickness = reservoir_base - reservoir_top
 ntg = total_coal / reservoir_thickness * 100
@@ -159,25 +161,25 @@ for fm in walloon_formations:
     else:
         fm_base = reservoir_base
     
-    # Count coal in this formation
-    fm_coal = coal_seams[(coal_seams['Top_m'] >= fm_top) & (coal_seams['Top_m'] < fm_base)]
-    fm_thickness = fm_coal['Thickness_m'].sum()
-    fm_ntg = fm_thickness / (fm_base - fm_top) * 100 if fm_base > fm_top else 0
-    
     coal_by_formation.append({
         'Formation': fm,
         'Top_m': fm_top,
         'Base_m': fm_base,
-        'Gross_Thickness_m': fm_base - fm_top,
-        'Num_Seams': len(fm_coal),
-        'Coal_Thickness_m': fm_thickness,
-        'NTG_Percent': fm_ntg
+        'Gross_Thickness_m': fm_base - fm_top
     })
 
 fm_summary = pd.DataFrame(coal_by_formation)
 
-# Create summary document
-summary_md = f"""# Coal Seam Analysis Summary
+# Count coal in each formation: one (seam, formation) containment test on seam tops
+seam_in_fm = ((coal_seams['Top_m'].values[:, np.newaxis] >= fm_summary['Top_m'].values) &
+              (coal_seams['Top_m'].values[:, np.newaxis] < fm_summary['Base_m'].values))
+fm_summary['Num_Seams'] = seam_in_fm.sum(axis=0)
+fm_summary['Coal_Thickness_m'] = coal_seams['Thickness_m'].values @ seam_in_fm
+fm_summary['NTG_Percent'] = np.where(fm_summary['Gross_Thickness_m'] > 0,
+                                     fm_summary['Coal_Thickness_m'] / fm_summary['Gross_Thickness_m'] * 100, 0)
+
+# Create summary document (sections collected in a list and joined once)
+summary_parts = [f"""# Coal Seam Analysis Summary
 **Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
 **Well:** Anya 105  
 **Basin:** Surat Basin, Queensland, Australia  
@@ -203,39 +205,39 @@ summary_md = f"""# Coal Seam Analysis Summary
 | **Number of Coal Seams** | {n_seams} |
 | **Total Coal Thickness** | {total_coal:.2f} m |
 | **Net-to-Gross** | {ntg:.1f}% |
-| **Average Seam Thickness** | {coal_seams['Thickness_m'].mean():.3f} m |
-| **Thickest Seam** | {coal_seams['Thickness_m'].max():.3f} m |
-| **Thinnest Seam** | {coal_seams['Thickness_m'].min():.3f} m |
+| **Average Seam Thickness** | {thickness_stats['mean']:.3f} m |
+| **Thickest Seam** | {thickness_stats['max']:.3f} m |
+| **Thinnest Seam** | {thickness_stats['min']:.3f} m |
 
 ## Coal Distribution by Formation
 
 | Formation | Top (m) | Base (m) | Gross (m) | Seams | Coal (m) | NTG (%) |
 |-----------|---------|----------|-----------|-------|----------|---------|
-"""
+"""]
 
 for _, row in fm_summary.iterrows():
-    summary_md += f"| {row['Formation']:<30s} | {row['Top_m']:>7.1f} | {row['Base_m']:>8.1f} | {row['Gross_Thickness_m']:>9.1f} | {row['Num_Seams']:>5d} | {row['Coal_Thickness_m']:>8.2f} | {row['NTG_Percent']:>7.1f} |\n"
+    summary_parts.append(f"| {row['Formation']:<30s} | {row['Top_m']:>7.1f} | {row['Base_m']:>8.1f} | {row['Gross_Thickness_m']:>9.1f} | {row['Num_Seams']:>5d} | {row['Coal_Thickness_m']:>8.2f} | {row['NTG_Percent']:>7.1f} |\n")
 
-summary_md += f"""
+summary_parts.append(f"""
 ## Top 10 Thickest Seams
 
 | Rank | Top (m) | Base (m) | Thickness (m) | Avg Conductivity |
 |------|---------|----------|---------------|------------------|
-"""
+""")
 
 top_seams = coal_seams.nlargest(10, 'Thickness_m')
 for i, (_, seam) in enumerate(top_seams.iterrows(), 1):
-    summary_md += f"| {i:>4d} | {seam['Top_m']:>7.2f} | {seam['Base_m']:>8.2f} | {seam['Thickness_m']:>13.3f} | {seam['AvgConductivity']:>16.1f} |\n"
+    summary_parts.append(f"| {i:>4d} | {seam['Top_m']:>7.2f} | {seam['Base_m']:>8.2f} | {seam['Thickness_m']:>13.3f} | {seam['AvgConductivity']:>16.1f} |\n")
 
-summary_md += f"""
+summary_parts.append(f"""
 ## Files Generated
 
-"""
+""")
 
 for f in copied_files:
-    summary_md += f"- `{f}`\n"
+    summary_parts.append(f"- `{f}`\n")
 
-summary_md += """
+summary_parts.append("""
 ## Methodology
 
 ### CMI Processing
@@ -259,7 +261,8 @@ Conductivity cutoff (178) determined as midpoint between:
 
 This provides balanced detection: conservative enough to ensure high confidence,
 aggressive enough to capture thin seams visible only in high-resolution CMI data.
-"""
+""")
+summary_md = ''.join(summary_parts)
 
 # Save summary
 summary_file = os.path.join(OUTPUT_DIR, 'ANALYSIS_SUMMARY.md')
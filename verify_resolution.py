@@ -9,6 +9,8 @@ import numpy as np
 from dlisio import dlis
 import matplotlib.pyplot as plt
 from matplotlib.colors import LinearSegmentedColormap
+from cmi_io import azimuth_lines
+
 
 print("\n" + "="*80)
 print("VERIFYING CMI IMAGE RESOLUTION")
@@ -18,7 +20,8 @@ print("="*80)
 print("\nLoading processed image...")
 df_custom = pd.read_csv('CMI_NoInterpolation_Image.csv', index_col=0)
 print(f"Custom image shape: {df_custom.shape}")
-print(f"Depth increment: {np.median(np.diff(df_custom.index)):.6f}m = {np.median(np.diff(df_custom.index))*1000:.1f}mm")
+depth_spacing = np.median(np.diff(df_custom.index))
+print(f"Depth increment: {depth_spacing:.6f}m = {depth_spacing*1000:.1f}mm")
 print(f"Image type: Within-pad interpolation only")
 
 # Load vendor image for comparison
@@ -78,7 +81,7 @@ for zoom in zoom_windows:
     extent = [0, 360, zoom_depth.max(), zoom_depth.min()]
     
     # Panel 1: Our processed image
-    im1 = axes[0].imshow(zoom_custom, aspect='auto', extent=extent,
+    im1 = axes[0].imshow(zoom_custom, aspect='auto', rasterized=True, extent=extent,
                          cmap=coal_cmap, interpolation='none', vmin=0, vmax=255)
     axes[0].set_xlabel('Azimuth (degrees)', fontweight='bold', fontsize=11)
     axes[0].set_ylabel('Depth (m)', fontweight='bold', fontsize=12)
@@ -88,14 +91,13 @@ for zoom in zoom_windows:
     axes[0].grid(True, alpha=0.3, color='white', linewidth=0.5)
     
     # Add pad reference lines
-    for pad_az in [0, 45, 90, 135, 180, 225, 270, 315]:
-        axes[0].axvline(pad_az, color='red', linestyle='--', linewidth=0.8, alpha=0.6)
+    azimuth_lines(axes[0], [0, 45, 90, 135, 180, 225, 270, 315], color='red', linestyle='--', linewidth=0.8, alpha=0.6)
     
     cbar1 = plt.colorbar(im1, ax=axes[0], pad=0.02)
     cbar1.set_label('Intensity [0-255]', fontweight='bold')
     
     # Panel 2: Vendor image
-    im2 = axes[1].imshow(zoom_vendor, aspect='auto', extent=extent,
+    im2 = axes[1].imshow(zoom_vendor, aspect='auto', rasterized=True, extent=extent,
                          cmap=coal_cmap, interpolation='none', vmin=0, vmax=255)
     axes[1].set_xlabel('Azimuth (degrees)', fontweight='bold', fontsize=11)
     axes[1].set_ylabel('Depth (m)', fontweight='bold', fontsize=12)
@@ -105,8 +107,7 @@ for zoom in zoom_windows:
     axes[1].grid(True, alpha=0.3, color='white', linewidth=0.5)
     
     # Add pad reference lines
-    for pad_az in [0, 45, 90, 135, 180, 225, 270, 315]:
-        axes[1].axvline(pad_az, color='red', linestyle='--', linewidth=0.8, alpha=0.6)
+    azimuth_lines(axes[1], [0, 45, 90, 135, 180, 225, 270, 315], color='red', linestyle='--', linewidth=0.8, alpha=0.6)
     
     cbar2 = plt.colorbar(im2, ax=axes[1], pad=0.02)
     cbar2.set_label('Intensity [0-255]', fontweight='bold')
@@ -138,7 +139,7 @@ for zoom in zoom_windows:
     print(f"  ✓ Saved: {output_png}")
     
     output_pdf = f'CMI_Resolution_Verify_{name.replace(" ", "_")}.pdf'
-    plt.savefig(output_pdf, bbox_inches='tight')
+    plt.savefig(output_pdf, dpi=150, bbox_inches='tight')
     print(f"  ✓ Saved: {output_pdf}")
 
 # Create an ultra-zoomed view (1 meter) to show individual samples
@@ -165,7 +166,7 @@ fig, axes = plt.subplots(1, 4, figsize=(28, 10))
 extent = [0, 360, zoom_depth.max(), zoom_depth.min()]
 
 # Panel 1: Our image
-im1 = axes[0].imshow(zoom_custom, aspect='auto', extent=extent,
+im1 = axes[0].imshow(zoom_custom, aspect='auto', rasterized=True, extent=extent,
                      cmap=coal_cmap, interpolation='none', vmin=0, vmax=255)
 axes[0].set_xlabel('Azimuth (degrees)', fontweight='bold', fontsize=10)
 axes[0].set_ylabel('Depth (m)', fontweight='bold', fontsize=11)
@@ -173,14 +174,13 @@ axes[0].set_title(f'Within-Pad Interp\n{len(zoom_depth)} samples', fontweight='b
 axes[0].set_xticks([0, 45, 90, 135, 180, 225, 270, 315, 360])
 
 # Add pad reference lines
-for pad_az in [0, 45, 90, 135, 180, 225, 270, 315]:
-    axes[0].axvline(pad_az, color='red', linestyle='--', linewidth=0.8, alpha=0.6)
+azimuth_lines(axes[0], [0, 45, 90, 135, 180, 225, 270, 315], color='red', linestyle='--', linewidth=0.8, alpha=0.6)
 
 cbar1 = plt.colorbar(im1, ax=axes[0], pad=0.02)
 cbar1.set_label('Intensity', fontweight='bold', fontsize=9)
 
 # Panel 2: Vendor image
-im2 = axes[1].imshow(zoom_vendor, aspect='auto', extent=extent,
+im2 = axes[1].imshow(zoom_vendor, aspect='auto', rasterized=True, extent=extent,
                      cmap=coal_cmap, interpolation='none', vmin=0, vmax=255)
 axes[1].set_xlabel('Azimuth (degrees)', fontweight='bold', fontsize=10)
 axes[1].set_ylabel('Depth (m)', fontweight='bold', fontsize=11)
@@ -188,8 +188,7 @@ axes[1].set_title(f'Vendor\n{len(zoom_vendor)} samples', fontweight='bold', font
 axes[1].set_xticks([0, 45, 90, 135, 180, 225, 270, 315, 360])
 
 # Add pad reference lines
-for pad_az in [0, 45, 90, 135, 180, 225, 270, 315]:
-    axes[1].axvline(pad_az, color='red', linestyle='--', linewidth=0.8, alpha=0.6)
+azimuth_lines(axes[1], [0, 45, 90, 135, 180, 225, 270, 315], color='red', linestyle='--', linewidth=0.8, alpha=0.6)
 
 cbar2 = plt.colorbar(im2, ax=axes[1], pad=0.02)
 cbar2.set_label('Intensity', fontweight='bold', fontsize=9)
@@ -239,7 +238,7 @@ plt.savefig(output_png, dpi=400, bbox_inches='tight')
 print(f"✓ Saved: {output_png}")
 
 output_pdf = 'CMI_Resolution_UltraZoom_1m.pdf'
-plt.savefig(output_pdf, bbox_inches='tight')
+plt.savefig(output_pdf, dpi=150, bbox_inches='tight')
 print(f"✓ Saved: {output_pdf}")
 
 print("\n" + "="*80)